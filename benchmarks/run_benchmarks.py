@@ -0,0 +1,236 @@
+"""
+Офлайн-бенчмарк режимов парсера на записанных страницах.
+
+Страницы документации и PEP берутся из tests/fixture_data и отдаются
+локальной mock-сессией, поэтому замеры не зависят от сети. Каждый замер
+выполняется в отдельном процессе, чтобы пиковый RSS относился только к нему.
+
+Запуск из корня репозитория:
+
+    python benchmarks/run_benchmarks.py --peps 600 --repeat 3
+"""
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import requests
+import requests_mock
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / 'src'))
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+EMPTY_ZIP = b'PK\x05\x06' + b'\x00' * 18
+ENGINES = ('bs4', 'lxml')
+MODES = ('whats-new', 'latest-versions', 'download', 'pep')
+
+
+def peak_rss_mb():
+    """Пиковый RSS текущего процесса в мегабайтах."""
+    if resource is None:
+        return None
+    # На Linux ru_maxrss в килобайтах, на macOS — в байтах
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divider = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+    return peak / divider
+
+
+def mock_session(pages):
+    """Создаёт сессию, которая отдаёт записанные страницы без сети."""
+    from tests.fixture_data.site_pages import archive_urls
+
+    adapter = requests_mock.Adapter()
+    for url, html in pages.items():
+        adapter.register_uri('GET', url, text=html)
+    for url in archive_urls():
+        adapter.register_uri(
+            'HEAD', url, headers={'Content-Length': str(len(EMPTY_ZIP))})
+        adapter.register_uri('GET', url, content=EMPTY_ZIP)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    return session, adapter
+
+
+def bench_mode(mode, engine, pep_count, workers):
+    """Замеряет режим парсера целиком: загрузку, разбор и извлечение."""
+    import main
+    from tests.fixture_data.site_pages import build_site
+
+    session, adapter = mock_session(build_site(pep_count))
+    options = {'engine': engine}
+    if mode in ('whats-new', 'pep'):
+        options['workers'] = workers
+
+    with tempfile.TemporaryDirectory() as temp_dir, \
+            contextlib.redirect_stderr(io.StringIO()):
+        main.BASE_DIR = Path(temp_dir)
+        started = time.perf_counter()
+        main.MODE_TO_FUNCTION[mode](session, **options)
+        elapsed = time.perf_counter() - started
+
+    return {
+        'name': f'mode:{mode}',
+        'engine': engine,
+        'pages': adapter.call_count,
+        'seconds': elapsed,
+        'pages_per_second': adapter.call_count / elapsed,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def time_calls(func, args_list):
+    """Вызывает func для каждого набора аргументов и замеряет время."""
+    timings = []
+    for args in args_list:
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def micro_result(name, engine, timings):
+    """Оформляет результат микробенчмарка."""
+    total = sum(timings)
+    return {
+        'name': name,
+        'engine': engine,
+        'pages': len(timings),
+        'seconds': total,
+        'pages_per_second': len(timings) / total,
+        'parse_ms': statistics.mean(timings) * 1000,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def bench_fetch_soup(pep_count):
+    """Замеряет utils.fetch_soup на карточках PEP."""
+    import utils
+    from tests.fixture_data.site_pages import build_site, pep_url
+
+    session, _ = mock_session(build_site(pep_count))
+    urls = [(session, pep_url(number)) for number in range(1, pep_count + 1)]
+    return micro_result(
+        'utils.fetch_soup', 'bs4', time_calls(utils.fetch_soup, urls))
+
+
+def bench_find_tag(pep_count):
+    """Замеряет utils.find_tag на заранее разобранных карточках PEP."""
+    import utils
+    from tests.fixture_data.site_pages import build_site, pep_url
+
+    pages = build_site(pep_count)
+    soups = [
+        (utils.make_soup(pages[pep_url(number)]), 'dl',
+         {'class': 'rfc2822 field-list simple'})
+        for number in range(1, pep_count + 1)
+    ]
+    return micro_result(
+        'utils.find_tag', 'bs4', time_calls(utils.find_tag, soups))
+
+
+def bench_extract_pep_card(engine, pep_count):
+    """Замеряет разбор карточки PEP выбранным движком."""
+    import extractors
+    from tests.fixture_data.site_pages import build_site, pep_url
+
+    pages = build_site(pep_count)
+    cards = [
+        (pages[pep_url(number)], engine)
+        for number in range(1, pep_count + 1)
+    ]
+    return micro_result(
+        'extractors.extract_pep_card', engine,
+        time_calls(extractors.extract_pep_card, cards))
+
+
+def benchmark_cases(pep_count, workers):
+    """Перечисляет все замеры: режимы целиком и горячие участки."""
+    cases = [
+        (bench_mode, mode, engine, pep_count, workers)
+        for mode in MODES
+        for engine in ENGINES
+    ]
+    cases.append((bench_fetch_soup, pep_count))
+    cases.append((bench_find_tag, pep_count))
+    cases.extend(
+        (bench_extract_pep_card, engine, pep_count) for engine in ENGINES)
+    return cases
+
+
+def run_case(case):
+    """Выполняет один замер."""
+    func, *args = case
+    return func(*args)
+
+
+def run_benchmarks(pep_count=200, repeat=1, workers=8):
+    """
+    Выполняет все замеры repeat раз и возвращает лучшие результаты.
+
+    Каждый замер запускается в отдельном процессе.
+    """
+    results = []
+    for case in benchmark_cases(pep_count, workers):
+        runs = []
+        for _ in range(repeat):
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                runs.append(executor.submit(run_case, case).result())
+        results.append(min(runs, key=lambda run: run['seconds']))
+    return results
+
+
+def format_report(results):
+    """Форматирует результаты замеров в текстовую таблицу."""
+    lines = [
+        f'{"Замер":<30} {"Движок":<6} {"Страниц":>8} {"Время, с":>9} '
+        f'{"Стр./с":>9} {"Разбор, мс":>11} {"Пик RSS, МБ":>12}'
+    ]
+    for result in results:
+        parse_ms = result.get('parse_ms')
+        peak_rss = result['peak_rss_mb']
+        lines.append(
+            f'{result["name"]:<30} {result["engine"]:<6} '
+            f'{result["pages"]:>8} {result["seconds"]:>9.3f} '
+            f'{result["pages_per_second"]:>9.1f} '
+            f'{"" if parse_ms is None else f"{parse_ms:.3f}":>11} '
+            f'{"" if peak_rss is None else f"{peak_rss:.1f}":>12}'
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    """Запускает бенчмарк из командной строки."""
+    parser = argparse.ArgumentParser(
+        description='Офлайн-бенчмарк режимов парсера')
+    parser.add_argument('--peps', type=int, default=200,
+                        help='Количество PEP в записанном индексе')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Количество повторов каждого замера')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Количество параллельных загрузок')
+    parser.add_argument('--json', type=Path,
+                        help='Сохранить результаты в JSON-файл')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.peps, args.repeat, args.workers)
+    print(format_report(results))
+    if args.json is not None:
+        args.json.write_text(
+            json.dumps(results, ensure_ascii=False, indent=2),
+            encoding='utf-8')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+import sqlite3
+import threading
+import time
+import zlib
+
+from requests_cache import CachedSession
+from requests_cache.backends import FileCache, SQLiteCache
+from requests_cache.serializers import SerializerPipeline, Stage
+from requests_cache.serializers import pickle_serializer
+
+INDEX_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    accessed REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+'''
+
+UPSERT_COUNTER = '''
+INSERT INTO counters (name, value) VALUES (?, ?)
+ON CONFLICT (name) DO UPDATE SET value = value + excluded.value
+'''
+
+
+def compressed_serializer():
+    """
+    Возвращает сериализатор ответов, который сжимает их zlib.
+
+    Тексты HTML-страниц сжимаются в несколько раз, поэтому кеш
+    занимает на диске меньше места.
+    """
+    return SerializerPipeline(
+        [*pickle_serializer.stages,
+         Stage(zlib, dumps='compress', loads='decompress')],
+        name='pickle-zlib',
+        is_binary=True
+    )
+
+
+class CacheIndex:
+    """
+    Журнал обращений к записям кеша HTTP-запросов.
+
+    Хранит время последнего обращения к каждой записи и счётчики
+    попаданий и промахов в отдельной базе SQLite. Обращения копятся
+    в памяти и записываются в базу методом flush одной транзакцией.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.accessed = {}
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(INDEX_SCHEMA)
+
+    def touch(self, key, from_cache):
+        """Отмечает обращение к записи кеша."""
+        with self.lock:
+            self.accessed[key] = time.time()
+            if from_cache:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def flush(self):
+        """Записывает накопленные обращения в базу."""
+        with self.lock:
+            accessed, self.accessed = self.accessed, {}
+            counters = (('hits', self.hits), ('misses', self.misses))
+            self.hits = self.misses = 0
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO entries (key, accessed) '
+                    'VALUES (?, ?)', accessed.items())
+                self.connection.executemany(UPSERT_COUNTER, counters)
+
+    def access_times(self):
+        """Возвращает время последнего обращения к записям по ключам."""
+        with self.lock:
+            return dict(self.connection.execute(
+                'SELECT key, accessed FROM entries'))
+
+    def counters(self):
+        """Возвращает количество попаданий и промахов кеша."""
+        with self.lock:
+            counters = dict(self.connection.execute(
+                'SELECT name, value FROM counters'))
+        return counters.get('hits', 0), counters.get('misses', 0)
+
+    def forget(self, keys):
+        """Удаляет сведения об обращениях к записям."""
+        with self.lock, self.connection:
+            self.connection.executemany(
+                'DELETE FROM entries WHERE key = ?',
+                ((key,) for key in keys))
+
+    def close(self):
+        """Записывает накопленные обращения и закрывает базу."""
+        self.flush()
+        self.connection.close()
+
+
+class LruCachedSession(CachedSession):
+    """
+    Кеширующая сессия с ограничением размера кеша.
+
+    Обращения к записям кеша учитываются в CacheIndex. Если размер кеша
+    превышает max_size байт, метод trim удаляет записи, к которым дольше
+    всего не обращались. Запросы мимо кеша и проверки кеша запросом
+    с only_if_cached, не нашедшие свежей записи, не учитываются.
+    """
+
+    def __init__(self, *args, max_size=None, index_path=':memory:',
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_size = max_size
+        self.index = CacheIndex(index_path)
+
+    def send(self, request, **kwargs):
+        """Отправляет запрос и отмечает обращение к записи кеша."""
+        response = super().send(request, **kwargs)
+        cache_key = getattr(response, 'cache_key', None)
+        probe = 'only-if-cached' in request.headers.get('Cache-Control', '')
+        if probe and getattr(response, 'is_expired', False):
+            return response
+        if cache_key and not self.settings.disabled:
+            self.index.touch(
+                cache_key, getattr(response, 'from_cache', False))
+        return response
+
+    def trim(self):
+        """
+        Удаляет давно не использованные записи сверх max_size.
+
+        Возвращает количество удалённых записей и освобождённых байтов.
+        """
+        self.index.flush()
+        sizes = entry_sizes(self.cache)
+        accessed = self.index.access_times()
+        # Сведения о записях, удалённых из кеша другим способом
+        self.index.forget(accessed.keys() - sizes.keys())
+
+        excess = sum(sizes.values()) - (self.max_size or 0)
+        if not self.max_size or excess <= 0:
+            return 0, 0
+        evicted = []
+        freed = 0
+        for key in sorted(sizes, key=lambda key: accessed.get(key, 0)):
+            if freed >= excess:
+                break
+            evicted.append(key)
+            freed += sizes[key]
+        self.cache.delete(*evicted)
+        self.index.forget(evicted)
+        return len(evicted), freed
+
+    def close(self):
+        """Закрывает сессию вместе с журналом обращений."""
+        super().close()
+        self.index.close()
+
+
+def entry_sizes(cache):
+    """
+    Возвращает размеры записей кеша в байтах по ключам.
+
+    Для SQLite и файлового хранилища это размер сжатой записи на диске,
+    для остальных — размер тела ответа.
+    """
+    responses = cache.responses
+    if isinstance(cache, SQLiteCache):
+        with responses.connection() as connection:
+            return dict(connection.execute(
+                f'SELECT key, LENGTH(value) FROM {responses.table_name}'))
+    if isinstance(cache, FileCache):
+        return {
+            path.stem: path.stat().st_size for path in responses.paths()
+        }
+    return {
+        key: len(response.content) for key, response in responses.items()
+    }
+
+
+def collect_cache_stats(session, largest):
+    """
+    Собирает сводку по кешу сессии.
+
+    Возвращает количество записей, их общий размер, количество попаданий
+    и промахов и список из largest крупнейших записей в виде пар
+    (URL, размер).
+    """
+    index = getattr(session, 'index', None)
+    if index is not None:
+        index.flush()
+    hits, misses = index.counters() if index is not None else (0, 0)
+    sizes = entry_sizes(session.cache)
+    largest_entries = []
+    for key in sorted(sizes, key=sizes.get, reverse=True)[:largest]:
+        response = session.cache.responses.get(key)
+        if response is not None:
+            largest_entries.append((response.url, sizes[key]))
+    return {
+        'entries': len(sizes),
+        'bytes': sum(sizes.values()),
+        'hits': hits,
+        'misses': misses,
+        'largest': largest_entries,
+    }
@@ -0,0 +1,112 @@
+import json
+import time
+
+from constants import CHECKPOINT_EVERY, CHECKPOINT_INTERVAL
+from exceptions import PageLoadError
+
+
+def load_checkpoint(path):
+    """
+    Загружает результаты обработанных страниц из журнала.
+
+    Возвращает словарь результатов по URL. Строку, которую не успели
+    дописать до прерывания прогона, и отсутствующий журнал пропускает.
+    """
+    done = {}
+    try:
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    url, result = json.loads(line)
+                except ValueError:
+                    continue
+                done[url] = result
+    except OSError:
+        pass
+    return done
+
+
+class Checkpoint:
+    """
+    Журнал страниц, обработанных за долгий прогон режима.
+
+    Каждая обработанная страница дописывается в файл JSON Lines парой
+    [URL, результат]. Записи сбрасываются на диск каждые every страниц
+    и не реже раза в interval секунд, поэтому прерванный прогон теряет
+    не больше одной пачки. С resume=True результаты из журнала прошлого
+    прогона попадают в done, и эти страницы не обрабатываются заново.
+    Если блок with завершился без ошибок, журнал удаляется.
+    С path=None журнал не ведётся, и все страницы обрабатываются заново.
+    """
+
+    def __init__(self, path, resume=False, every=CHECKPOINT_EVERY,
+                 interval=CHECKPOINT_INTERVAL):
+        self.path = path
+        self.done = load_checkpoint(path) if resume and path else {}
+        self.every = every
+        self.interval = interval
+        self.pending = []
+        self.flushed_at = time.monotonic()
+        self.file = None
+
+    def __enter__(self):
+        if self.path is None:
+            return self
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Журнал переписывается целиком: недописанная строка прошлого
+        # прогона не должна склеиться с новыми записями
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.pending = [[url, result] for url, result in self.done.items()]
+        self.flush()
+        return self
+
+    def add(self, url, result):
+        """Отмечает страницу обработанной."""
+        if self.path is None:
+            return
+        self.pending.append([url, result])
+        if (len(self.pending) >= self.every
+                or time.monotonic() - self.flushed_at >= self.interval):
+            self.flush()
+
+    def flush(self):
+        """Дописывает накопленные записи в журнал."""
+        self.file.writelines(
+            json.dumps(entry, ensure_ascii=False) + '\n'
+            for entry in self.pending)
+        self.file.flush()
+        self.pending = []
+        self.flushed_at = time.monotonic()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.path is None:
+            return
+        if exc_type is None:
+            self.file.close()
+            self.path.unlink()
+            return
+        self.flush()
+        self.file.close()
+
+
+def checkpointed(checkpoint, urls, extract_pending):
+    """
+    Возвращает результаты обработки urls в их порядке.
+
+    Результаты страниц из checkpoint.done берутся из журнала, остальные
+    URL передаются одним списком в extract_pending, которая возвращает
+    результаты в том же порядке. Успешные результаты записываются
+    в журнал, ошибки загрузки PageLoadError — нет.
+    """
+    from_checkpoint = [url in checkpoint.done for url in urls]
+    fresh = iter(extract_pending([
+        url for url, done in zip(urls, from_checkpoint) if not done
+    ]))
+    for url, done in zip(urls, from_checkpoint):
+        if done:
+            yield checkpoint.done[url]
+            continue
+        result = next(fresh)
+        if not isinstance(result, PageLoadError):
+            checkpoint.add(url, result)
+        yield result
@@ -1,9 +1,84 @@
 import argparse
+import datetime as dt
 import logging
 from logging.handlers import RotatingFileHandler
+from pathlib import Path
 
-from constants import (BASE_DIR, DT_FORMAT, LOG_FORMAT, LOGS_DIR_NAME,
-                       LOGS_FILE_NAME, OUTPUT_FILE, OUTPUT_PRETTY)
+from constants import (BASE_DIR, CACHE_BACKENDS, CACHE_DIR_NAME,
+                       CACHE_FILE_NAME, CACHE_MAX_SIZE_MB,
+                       CACHE_STATS_LARGEST, CACHE_URLS_EXPIRE_AFTER,
+                       DEFAULT_CACHE_BACKEND, DEFAULT_DOWNLOAD_FORMAT,
+                       DEFAULT_WORKERS,
+                       DOWNLOAD_FORMATS, DOWNLOAD_SEGMENTS, DT_FORMAT,
+                       ENGINE_BS4, ENGINE_LXML, FETCH_RETRIES, LOG_FORMAT,
+                       LOGS_DIR_NAME, LOGS_FILE_NAME, METRICS_JSON,
+                       METRICS_PROMETHEUS, OUTPUT_CSV_GZIP, OUTPUT_CSV_ZSTD,
+                       OUTPUT_FILE, OUTPUT_NDJSON, OUTPUT_PARQUET,
+                       OUTPUT_PRETTY, RATE_BURST, RATE_LIMIT,
+                       REQUEST_TIMEOUT, SERVE_HOST, SERVE_PORT,
+                       SERVE_REFRESH_INTERVAL)
+
+
+def positive_int(value):
+    """Преобразует аргумент командной строки в положительное число."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается положительное число, получено: {value}')
+    return number
+
+
+def non_negative_int(value):
+    """Преобразует аргумент командной строки в неотрицательное число."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается неотрицательное число, получено: {value}')
+    return number
+
+
+def non_negative_float(value):
+    """Преобразует аргумент командной строки в неотрицательное число."""
+    number = float(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается неотрицательное число, получено: {value}')
+    return number
+
+
+def expire_rule(value):
+    """Разбирает правило срока хранения в кеше вида ШАБЛОН=СЕКУНДЫ."""
+    pattern, separator, seconds = value.rpartition('=')
+    if not separator or not pattern:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается правило вида ШАБЛОН=СЕКУНДЫ, получено: {value}')
+    try:
+        return pattern, int(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'Срок хранения должен быть целым числом секунд: {value}')
+
+
+def iso_datetime(value):
+    """Преобразует аргумент командной строки в дату и время ISO 8601."""
+    try:
+        return dt.datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается дата вида ГГГГ-ММ-ДД[TЧЧ:ММ], получено: {value}')
+
+
+def shard_spec(value):
+    """Разбирает номер шарда вида i/N, где 1 <= i <= N."""
+    number, separator, count = value.partition('/')
+    try:
+        shard = int(number), int(count)
+    except ValueError:
+        shard = None
+    if not separator or shard is None or not 1 <= shard[0] <= shard[1]:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается шард вида i/N, где 1 <= i <= N, получено: {value}')
+    return shard
 
 
 def configure_argument_parser(available_modes):
@@ -21,12 +96,214 @@ def configure_argument_parser(available_modes):
         action='store_true',
         help='Очистка кеша'
     )
+    parser.add_argument(
+        '--cache-backend',
+        choices=CACHE_BACKENDS,
+        default=DEFAULT_CACHE_BACKEND,
+        help='Хранилище кеша HTTP-запросов'
+    )
+    parser.add_argument(
+        '--cache-path',
+        type=Path,
+        help='Путь к кешу HTTP-запросов (без расширения)'
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=non_negative_int,
+        default=CACHE_MAX_SIZE_MB,
+        help='Предельный размер кеша в мегабайтах (0 — без ограничения)'
+    )
+    parser.add_argument(
+        '--largest',
+        type=positive_int,
+        default=CACHE_STATS_LARGEST,
+        help='Количество крупнейших записей в отчёте cache-stats'
+    )
+    parser.add_argument(
+        '--replay',
+        type=Path,
+        metavar='СНИМОК',
+        help='Брать страницы из файла снимка без обращения к сети'
+    )
+    parser.add_argument(
+        '--snapshot-path',
+        type=Path,
+        help='Путь к файлу снимка, который создаёт режим snapshot'
+    )
     parser.add_argument(
         '-o',
         '--output',
-        choices=(OUTPUT_PRETTY, OUTPUT_FILE),
+        choices=(OUTPUT_PRETTY, OUTPUT_FILE, OUTPUT_NDJSON, OUTPUT_CSV_GZIP,
+                 OUTPUT_CSV_ZSTD, OUTPUT_PARQUET),
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '-s',
+        '--stream',
+        action='store_true',
+        help='Выводить строки результата по мере их получения'
+    )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        '--concurrency',
+        type=positive_int,
+        default=DEFAULT_WORKERS,
+        help='Количество параллельных загрузок страниц'
+    )
+    parser.add_argument(
+        '--rate',
+        type=non_negative_float,
+        default=RATE_LIMIT,
+        help='Предельная частота запросов страниц к одному хосту '
+             'в секунду (0 — без ограничения)'
+    )
+    parser.add_argument(
+        '--burst',
+        type=positive_int,
+        default=RATE_BURST,
+        help='Количество запросов к хосту, которые можно отправить '
+             'подряд без паузы'
+    )
+    parser.add_argument(
+        '--retries',
+        type=non_negative_int,
+        default=FETCH_RETRIES,
+        help='Количество повторов запроса страницы после сетевой ошибки'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=positive_int,
+        default=REQUEST_TIMEOUT,
+        help='Тайм-аут запроса страницы в секундах'
+    )
+    parser.add_argument(
+        '--parse-workers',
+        type=non_negative_int,
+        default=0,
+        help='Количество процессов для разбора HTML '
+             '(0 — разбор в потоках загрузки)'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=(ENGINE_BS4, ENGINE_LXML),
+        default=ENGINE_BS4,
+        help='Движок извлечения данных из HTML'
+    )
+    parser.add_argument(
+        '-r',
+        '--revalidate',
+        action='store_true',
+        help='Проверять актуальность кеша условными запросами '
+             '(If-None-Match/If-Modified-Since)'
+    )
+    parser.add_argument(
+        '--expire',
+        type=expire_rule,
+        action='append',
+        default=[],
+        metavar='ШАБЛОН=СЕКУНДЫ',
+        help='Срок хранения в кеше для страниц по шаблону URL '
+             '(-1 — бессрочно, 0 — не кешировать)'
+    )
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='Загружать только карточки PEP, изменившиеся в индексе '
+             'с прошлого запуска'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Продолжить прерванный прогон pep или whats-new: не загружать '
+             'страницы, уже обработанные в нём'
+    )
+    parser.add_argument(
+        '-d',
+        '--store',
+        action='store_true',
+        help='Сохранять записи PEP в базу SQLite для режима query'
+    )
+    parser.add_argument(
+        '--shard',
+        type=shard_spec,
+        metavar='i/N',
+        help='Обработать в режиме pep только i-ю из N частей индекса PEP '
+             'и сохранить результат для режима merge'
+    )
+    parser.add_argument(
+        '--shard-dir',
+        type=Path,
+        help='Директория с результатами шардов для режимов pep и merge'
+    )
+    parser.add_argument(
+        '--status',
+        help='Статус PEP для режима query, например Accepted'
+    )
+    parser.add_argument(
+        '--type',
+        dest='pep_type',
+        help='Тип PEP для режима query, например "Standards Track"'
+    )
+    parser.add_argument(
+        '--mismatches',
+        action='store_true',
+        help='Выбрать в режиме query только PEP с несовпадающими статусами'
+    )
+    parser.add_argument(
+        '--since',
+        type=iso_datetime,
+        help='Выбрать в режиме query только PEP, несовпадение статусов '
+             'которых впервые обнаружено начиная с этой даты'
+    )
+    parser.add_argument(
+        '--formats',
+        nargs='+',
+        choices=tuple(DOWNLOAD_FORMATS),
+        default=(DEFAULT_DOWNLOAD_FORMAT,),
+        help='Форматы архивов документации для режима download'
+    )
+    parser.add_argument(
+        '--segments',
+        type=positive_int,
+        default=DOWNLOAD_SEGMENTS,
+        help='Количество параллельных сегментов при загрузке '
+             'больших архивов'
+    )
+    parser.add_argument(
+        '--host',
+        default=SERVE_HOST,
+        help='Адрес, на котором режим serve принимает запросы'
+    )
+    parser.add_argument(
+        '--port',
+        type=non_negative_int,
+        default=SERVE_PORT,
+        help='Порт, на котором режим serve принимает запросы'
+    )
+    parser.add_argument(
+        '--socket',
+        dest='socket_path',
+        type=Path,
+        help='Принимать запросы режима serve через Unix-сокет по этому пути'
+    )
+    parser.add_argument(
+        '--refresh-interval',
+        type=positive_int,
+        default=SERVE_REFRESH_INTERVAL,
+        help='Период обновления результатов в режиме serve, в секундах'
+    )
+    parser.add_argument(
+        '--metrics',
+        choices=(METRICS_JSON, METRICS_PROMETHEUS),
+        help='Сохранить метрики загрузки и разбора страниц'
+    )
+    parser.add_argument(
+        '--metrics-path',
+        type=Path,
+        help='Путь к файлу с метриками'
+    )
     return parser
 
 
@@ -46,3 +323,92 @@ def configure_logging():
         level=logging.INFO,
         handlers=(rotating_handler, logging.StreamHandler())
     )
+
+
+def get_cache_settings(cli_args):
+    """
+    Собирает настройки кеша HTTP-запросов из аргументов командной строки.
+
+    Правила --expire проверяются раньше правил по умолчанию. Срок
+    хранения задают только эти правила: заголовки Cache-Control и Expires
+    ответа его не сокращают. Устаревшие страницы перезапрашиваются
+    условными запросами, и ответ 304 продлевает срок хранения
+    закешированной копии без повторной загрузки.
+    """
+    urls_expire_after = dict(cli_args.expire)
+    for pattern, expire_after in CACHE_URLS_EXPIRE_AFTER.items():
+        urls_expire_after.setdefault(pattern, expire_after)
+    return {
+        'urls_expire_after': urls_expire_after,
+        'always_revalidate': cli_args.revalidate,
+        'stale_if_error': True,
+    }
+
+
+def get_cache_storage_settings(cli_args):
+    """
+    Собирает настройки хранилища кеша из аргументов командной строки.
+
+    Ответы хранятся в сжатом виде. Журнал обращений к записям для
+    вытеснения по LRU лежит рядом с кешем в файле `<путь>_index.sqlite`.
+    """
+    from cache import compressed_serializer
+
+    cache_path = (cli_args.cache_path
+                  or BASE_DIR / CACHE_DIR_NAME / CACHE_FILE_NAME)
+    index_path = ':memory:'
+    if cli_args.cache_backend != 'memory':
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        index_path = f'{cache_path}_index.sqlite'
+    return {
+        'cache_name': str(cache_path),
+        'backend': cli_args.cache_backend,
+        'serializer': compressed_serializer(),
+        'max_size': cli_args.cache_max_size * 2 ** 20,
+        'index_path': index_path,
+    }
+
+
+def configure_session(cli_args):
+    """
+    Создаёт кеширующую сессию HTTP-запросов.
+
+    С аргументом --replay создаётся сессия, которая отвечает страницами
+    из файла снимка и не обращается к сети.
+
+    Модули requests и requests_cache импортируются здесь, а не при
+    загрузке модуля, чтобы вызов --help обходился без них.
+    """
+    if cli_args.replay is not None:
+        from snapshot import replay_session
+
+        return replay_session(cli_args.replay)
+
+    from requests.adapters import HTTPAdapter
+
+    from cache import LruCachedSession
+
+    session = LruCachedSession(
+        **get_cache_storage_settings(cli_args),
+        **get_cache_settings(cli_args)
+    )
+    # Пул соединений не меньше числа параллельных загрузок
+    session.mount('https://', HTTPAdapter(pool_maxsize=cli_args.workers))
+    return session
+
+
+def configure_scheduler(cli_args):
+    """
+    Настраивает общий планировщик запросов страниц.
+
+    При воспроизведении снимка частота запросов не ограничивается
+    и запросы страниц, которых нет в снимке, не повторяются.
+    """
+    from scheduler import SCHEDULER
+
+    if cli_args.replay is not None:
+        SCHEDULER.configure(max_concurrency=cli_args.workers, retries=0)
+        return
+    SCHEDULER.configure(rate=cli_args.rate, burst=cli_args.burst,
+                        max_concurrency=cli_args.workers,
+                        retries=cli_args.retries, timeout=cli_args.timeout)
@@ -22,6 +22,100 @@ EXPECTED_STATUS = {
     '': ('Draft', 'Active'),
 }
 
+# Количество параллельных загрузок страниц по умолчанию
+DEFAULT_WORKERS = 8
+# Сколько страниц на поток или процесс может одновременно загружаться,
+# разбираться или ждать, пока заберут результат
+IN_FLIGHT_PER_WORKER = 2
+
+# Журнал обработанных страниц долгого прогона сбрасывается на диск
+# каждые CHECKPOINT_EVERY страниц и не реже раза в CHECKPOINT_INTERVAL
+# секунд
+CHECKPOINT_EVERY = 50
+CHECKPOINT_INTERVAL = 10
+
+# Ограничение частоты запросов к одному хосту: запросов в секунду
+# и допустимая пачка запросов подряд (0 — без ограничения)
+RATE_LIMIT = 50.0
+RATE_BURST = 20
+
+# Ответы, по которым сервер просит снизить нагрузку. Такие запросы
+# повторяются после паузы из заголовка Retry-After (не дольше
+# MAX_RETRY_AFTER секунд) или после паузы THROTTLE_BACKOFF * 2^попытка.
+THROTTLE_STATUSES = (429, 503)
+THROTTLE_RETRIES = 3
+THROTTLE_BACKOFF = 0.5
+MAX_RETRY_AFTER = 60
+# Задержка ответа, во столько раз превышающая обычную для хоста,
+# считается признаком перегрузки сервера
+LATENCY_TOLERANCE = 2.0
+
+# Тайм-аут запроса страницы в секундах и повторы запросов после
+# сетевых ошибок: пауза перед повтором выбирается случайно от нуля
+# до RETRY_BACKOFF * 2^попытка, но не больше RETRY_BACKOFF_MAX секунд
+REQUEST_TIMEOUT = 15
+FETCH_RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRY_BACKOFF_MAX = 10
+# После CIRCUIT_FAILURE_THRESHOLD сетевых ошибок подряд запросы к хосту
+# сразу завершаются ошибкой; через CIRCUIT_RESET_TIMEOUT секунд
+# пропускается пробный запрос
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30
+
+# Срок хранения страниц в кеше по шаблонам URL, в секундах.
+# Шаблоны проверяются по порядку, срабатывает первый подходящий.
+# Индексные страницы меняются часто, карточки PEP и статьи — редко.
+HOUR = 60 * 60
+DAY = 24 * HOUR
+CACHE_URLS_EXPIRE_AFTER = {
+    'peps.python.org/pep-*': 7 * DAY,
+    'peps.python.org': HOUR,
+    'docs.python.org/3/whatsnew/*.html': 7 * DAY,
+    'docs.python.org/3/archives/*': DAY,
+    'docs.python.org': HOUR,
+}
+
+# Хранилище кеша HTTP-запросов: движок по умолчанию и предельный
+# размер в мегабайтах (0 — без ограничения), при превышении которого
+# удаляются записи, к которым дольше всего не обращались
+CACHE_BACKENDS = ('sqlite', 'filesystem', 'memory')
+DEFAULT_CACHE_BACKEND = 'sqlite'
+CACHE_MAX_SIZE_MB = 200
+# Количество крупнейших записей в отчёте режима cache-stats
+CACHE_STATS_LARGEST = 10
+
+# Размер фрагмента при потоковой загрузке архивов, в байтах
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Форматы архивов документации и шаблоны ссылок на них
+DOWNLOAD_FORMATS = {
+    'pdf-a4': r'.+pdf-a4\.zip$',
+    'pdf-letter': r'.+pdf-letter\.zip$',
+    'html': r'.+docs-html\.zip$',
+    'text': r'.+docs-text\.zip$',
+    'epub': r'.+\.epub$',
+}
+DEFAULT_DOWNLOAD_FORMAT = 'pdf-a4'
+
+# Архивы крупнее этого размера скачиваются параллельными
+# сегментами по Range-запросам
+DOWNLOAD_SEGMENTS = 4
+SEGMENTED_DOWNLOAD_MIN_SIZE = 8 * 1024 * 1024
+
+# Движки извлечения данных из HTML
+ENGINE_BS4 = 'bs4'
+ENGINE_LXML = 'lxml'
+
+# Режим serve: адрес HTTP-сервера по умолчанию и период обновления
+# индекса результатов в секундах
+SERVE_HOST = '127.0.0.1'
+SERVE_PORT = 8765
+SERVE_REFRESH_INTERVAL = 5 * 60
+
+# Количество записей в одной пачке вставки в базу SQLite
+STORE_BATCH_SIZE = 500
+
 # Конфигурация логирования
 LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
 DT_FORMAT = '%d.%m.%Y %H:%M:%S'
@@ -29,9 +123,27 @@ DT_FORMAT = '%d.%m.%Y %H:%M:%S'
 # Форматы вывода данных
 OUTPUT_PRETTY = 'pretty'
 OUTPUT_FILE = 'file'
+OUTPUT_NDJSON = 'ndjson'
+OUTPUT_CSV_GZIP = 'csv-gz'
+OUTPUT_CSV_ZSTD = 'csv-zst'
+OUTPUT_PARQUET = 'parquet'
+
+# Форматы файла с метриками
+METRICS_JSON = 'json'
+METRICS_PROMETHEUS = 'prometheus'
 
 # Имена директорий для хранения логов и результатов
 LOGS_DIR_NAME = 'logs'
 LOGS_FILE_NAME = 'parser.log'
 RESULTS_DIR_NAME = 'results'
 DOWNLOADS_DIR_NAME = 'downloads'
+STATE_DIR_NAME = 'state'
+METRICS_DIR_NAME = 'metrics'
+CACHE_DIR_NAME = 'cache'
+SNAPSHOTS_DIR_NAME = 'snapshots'
+SHARDS_DIR_NAME = 'shards'
+CACHE_FILE_NAME = 'http_cache'
+PEP_STATE_FILE_NAME = 'pep_index.json'
+PEP_SHARD_STATE_FILE_NAME = 'pep_index_{}-of-{}.json'
+PEP_STORE_FILE_NAME = 'peps.sqlite3'
+CHECKPOINT_FILE_SUFFIX = '_checkpoint.jsonl'
@@ -0,0 +1,279 @@
+import logging
+import os
+import re
+import time
+import zipfile
+from functools import partial
+
+from requests import RequestException, Session
+
+from constants import (DOWNLOAD_CHUNK_SIZE, DOWNLOAD_SEGMENTS,
+                       SEGMENTED_DOWNLOAD_MIN_SIZE)
+from exceptions import DownloadError, PageLoadError
+from utils import map_concurrently
+
+ZIP_SIGNATURES = (b'PK\x03\x04', b'PK\x05\x06')
+ZIP_SUFFIXES = ('.zip', '.epub')
+CONTENT_RANGE_PATTERN = re.compile(r'bytes (?P<start>\d+)-\d+/(?P<total>\d+)')
+
+
+def uncached_session(session):
+    """
+    Возвращает сессию, запросы которой идут мимо кеша.
+
+    Большие бинарные файлы не сохраняются в кеш HTTP-запросов. Для
+    кеширующей сессии создаётся обычная сессия с теми же заголовками
+    и адаптерами, то есть с общим пулом соединений; сессия без кеша
+    возвращается как есть. Контекст cache_disabled кеширующей сессии
+    для этого не подходит: он переключает настройку всей сессии
+    и не потокобезопасен, а архивы скачиваются из нескольких потоков.
+    """
+    if not hasattr(session, 'cache'):
+        return session
+    plain_session = Session()
+    plain_session.headers.update(session.headers)
+    plain_session.adapters = session.adapters
+    return plain_session
+
+
+def expected_size(response, offset):
+    """Определяет полный размер файла по заголовкам ответа."""
+    content_range = CONTENT_RANGE_PATTERN.match(
+        response.headers.get('Content-Range', ''))
+    if content_range is not None:
+        return int(content_range.group('total'))
+    content_length = response.headers.get('Content-Length')
+    if content_length is not None:
+        return offset + int(content_length)
+    return None
+
+
+def request_archive(session, url, offset):
+    """
+    Запрашивает файл потоком, начиная с байта offset.
+
+    Возвращает ответ и смещение, с которого он отдаёт данные: если сервер
+    не поддерживает Range и прислал файл целиком, смещение равно нулю.
+    """
+    headers = {'Range': f'bytes={offset}-'} if offset else {}
+    try:
+        response = uncached_session(session).get(
+            url, headers=headers, stream=True)
+    except RequestException as e:
+        raise PageLoadError(f"Ошибка при загрузке файла {url}: {e}")
+
+    if response.status_code == 416 and offset:
+        # Частично скачанный файл не совпадает с файлом на сервере
+        response.close()
+        return request_archive(session, url, 0)
+    if response.status_code not in (200, 206):
+        response.close()
+        raise PageLoadError(
+            f'Ошибка при загрузке файла {url}: '
+            f'код ответа {response.status_code}')
+    if response.status_code == 200:
+        offset = 0
+    return response, offset
+
+
+def check_zip_signature(chunk, url):
+    """Проверяет, что файл начинается с сигнатуры ZIP-архива."""
+    if not chunk.startswith(ZIP_SIGNATURES):
+        raise DownloadError(f'Файл {url} не является ZIP-архивом')
+
+
+def check_downloaded_file(part_path, url, size, verify_zip):
+    """Проверяет размер и целостность полностью скачанного файла."""
+    written = part_path.stat().st_size
+    if size is not None and written != size:
+        raise DownloadError(
+            f'Размер файла {url} не совпадает: '
+            f'ожидалось {size} байт, получено {written}')
+    if not verify_zip:
+        return
+    try:
+        with zipfile.ZipFile(part_path) as archive:
+            broken_member = archive.testzip()
+    except zipfile.BadZipFile as e:
+        raise DownloadError(f'Архив {url} повреждён: {e}')
+    if broken_member is not None:
+        raise DownloadError(
+            f'Архив {url} повреждён: ошибка в файле {broken_member}')
+
+
+def stream_download(session, url, path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    Скачивает файл потоком фиксированных фрагментов.
+
+    Данные пишутся во временный файл `<имя>.part`, который после проверки
+    размера и целостности атомарно переименовывается в path. Если
+    временный файл остался от прерванной загрузки, скачивание
+    продолжается с места остановки запросом с заголовком Range.
+    Запрос идёт мимо кеша HTTP-запросов, поэтому расход памяти
+    не зависит от размера файла.
+    """
+    part_path = path.with_name(path.name + '.part')
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    verify_zip = path.suffix in ZIP_SUFFIXES
+
+    response, offset = request_archive(session, url, offset)
+    if offset:
+        logging.info(f'Продолжение загрузки {url} с {offset} байт')
+
+    try:
+        with response, open(part_path, 'ab' if offset else 'wb') as file:
+            size = expected_size(response, offset)
+            for chunk in response.iter_content(chunk_size):
+                if verify_zip and file.tell() == 0:
+                    check_zip_signature(chunk, url)
+                file.write(chunk)
+        check_downloaded_file(part_path, url, size, verify_zip)
+    except RequestException as e:
+        # Скачанная часть сохраняется для продолжения загрузки
+        raise PageLoadError(f"Ошибка при загрузке файла {url}: {e}")
+    except DownloadError:
+        part_path.unlink()
+        raise
+
+    os.replace(part_path, path)
+    return path
+
+
+def probe_archive(session, url):
+    """
+    Узнаёт размер файла HEAD-запросом.
+
+    Возвращает None, если сервер не сообщает размер, не поддерживает
+    Range-запросы или не отвечает на HEAD-запрос.
+    """
+    try:
+        response = uncached_session(session).head(
+            url, allow_redirects=True)
+    except RequestException:
+        return None
+    content_length = response.headers.get('Content-Length')
+    if (response.status_code != 200
+            or response.headers.get('Accept-Ranges') != 'bytes'
+            or content_length is None):
+        return None
+    return int(content_length)
+
+
+def segment_bounds(size, segments):
+    """Делит файл на segments диапазонов байтов (включительно)."""
+    step = -(-size // segments)
+    return [
+        (start, min(start + step, size) - 1)
+        for start in range(0, size, step)
+    ]
+
+
+def download_segment(session, url, part_path, bounds,
+                     chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Скачивает диапазон байтов файла и пишет его на своё место."""
+    start, end = bounds
+    response = uncached_session(session).get(
+        url, headers={'Range': f'bytes={start}-{end}'}, stream=True)
+    with response, open(part_path, 'r+b') as file:
+        if response.status_code != 206:
+            raise DownloadError(
+                f'Сервер не вернул диапазон {start}-{end} файла {url}: '
+                f'код ответа {response.status_code}')
+        file.seek(start)
+        for chunk in response.iter_content(chunk_size):
+            file.write(chunk)
+        if file.tell() != end + 1:
+            raise DownloadError(
+                f'Диапазон {start}-{end} файла {url} скачан не полностью')
+
+
+def segmented_download(session, url, path, segments=DOWNLOAD_SEGMENTS,
+                       chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    Скачивает файл параллельными сегментами по Range-запросам.
+
+    Сегменты пишутся по своим смещениям в заранее выделенный временный
+    файл. Небольшие файлы и файлы с серверов без поддержки Range
+    скачиваются одним потоком через stream_download.
+    """
+    size = probe_archive(session, url) if segments > 1 else None
+    if size is None or size < SEGMENTED_DOWNLOAD_MIN_SIZE:
+        return stream_download(session, url, path, chunk_size)
+
+    part_path = path.with_name(path.name + '.part')
+    with open(part_path, 'wb') as file:
+        file.truncate(size)
+
+    try:
+        list(map_concurrently(
+            partial(download_segment, session, url, part_path,
+                    chunk_size=chunk_size),
+            segment_bounds(size, segments),
+            segments
+        ))
+        check_downloaded_file(
+            part_path, url, size, path.suffix in ZIP_SUFFIXES)
+    except RequestException as e:
+        part_path.unlink()
+        raise PageLoadError(f"Ошибка при загрузке файла {url}: {e}")
+    except DownloadError:
+        part_path.unlink()
+        raise
+
+    os.replace(part_path, path)
+    return path
+
+
+def timed_download(session, segments, archive):
+    """
+    Скачивает архив и замеряет время загрузки.
+
+    Возвращает путь, размер и время загрузки в секундах либо объект
+    исключения, чтобы сбой одного архива не прерывал остальные загрузки.
+    """
+    url, path = archive
+    started = time.perf_counter()
+    try:
+        segmented_download(session, url, path, segments)
+    except (PageLoadError, DownloadError) as e:
+        return e
+    return path, path.stat().st_size, time.perf_counter() - started
+
+
+def megabytes_per_second(size, seconds):
+    """Считает скорость загрузки в мегабайтах в секунду."""
+    return size / 2 ** 20 / max(seconds, 1e-6)
+
+
+def download_archives(session, archives, workers=1,
+                      segments=DOWNLOAD_SEGMENTS):
+    """
+    Параллельно скачивает архивы и логирует сводку по скорости.
+
+    archives — список пар (URL, путь для сохранения). Возвращает список
+    сохранённых путей.
+    """
+    started = time.perf_counter()
+    results = list(map_concurrently(
+        partial(timed_download, session, segments), archives, workers))
+    elapsed = time.perf_counter() - started
+
+    saved_paths = []
+    total_size = 0
+    for (url, _), result in zip(archives, results):
+        if isinstance(result, Exception):
+            logging.error(f'Не удалось загрузить архив {url}: {result}')
+            continue
+        path, size, seconds = result
+        saved_paths.append(path)
+        total_size += size
+        logging.info(
+            f'Архив был загружен и сохранён: {path} '
+            f'({size / 2 ** 20:.1f} МБ за {seconds:.2f} с, '
+            f'{megabytes_per_second(size, seconds):.1f} МБ/с)')
+
+    logging.info(
+        f'Загружено архивов: {len(saved_paths)} из {len(archives)}, '
+        f'{total_size / 2 ** 20:.1f} МБ за {elapsed:.2f} с, '
+        f'{megabytes_per_second(total_size, elapsed):.1f} МБ/с')
+    return saved_paths
@@ -2,9 +2,29 @@ class PageLoadError(Exception):
     """Исключение для ошибок загрузки страницы."""
 
 
+class CircuitOpenError(PageLoadError):
+    """Вызывается, когда запросы к недоступному хосту временно отключены."""
+
+
 class ParserFindTagException(Exception):
     """Вызывается, когда парсер не может найти тег."""
 
 
 class DataNotFoundError(Exception):
     """Вызывается при отсутствии ожидаемых данных."""
+
+
+class DownloadError(Exception):
+    """Вызывается, когда скачанный файл не прошёл проверку целостности."""
+
+
+class MissingDependencyError(Exception):
+    """Вызывается, когда для выбранной функции не установлен пакет."""
+
+
+class SnapshotError(Exception):
+    """Вызывается, когда файл снимка страниц повреждён."""
+
+
+class ShardMergeError(Exception):
+    """Вызывается, когда результаты шардов нельзя слить в полный прогон."""
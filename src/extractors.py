@@ -0,0 +1,295 @@
+import re
+
+from bs4 import SoupStrainer
+from lxml import etree
+
+from constants import DOWNLOAD_FORMATS, ENGINE_BS4, ENGINE_LXML
+from exceptions import DataNotFoundError
+from utils import (find_all_tag, find_node, find_tag, make_tree, parsed_soup,
+                   raise_tag_not_found)
+
+# Области страниц, которые нужны парсеру: остальная разметка
+# не превращается в дерево тегов.
+WHATS_NEW_INDEX_SCOPE = SoupStrainer(
+    'section', {'id': 'what-s-new-in-python'})
+WHATS_NEW_ARTICLE_SCOPE = SoupStrainer(['h1', 'dl'])
+LATEST_VERSIONS_SCOPE = SoupStrainer(
+    'div', {'class': 'sphinxsidebarwrapper'})
+DOWNLOAD_SCOPE = SoupStrainer('table', {'class': 'docutils'})
+PEP_INDEX_SCOPE = SoupStrainer(
+    'table', {'class': 'pep-zero-table docutils align-default'})
+PEP_CARD_SCOPE = SoupStrainer(['h1', 'dl'])
+
+DOWNLOAD_PATTERNS = {
+    archive_format: re.compile(pattern)
+    for archive_format, pattern in DOWNLOAD_FORMATS.items()
+}
+
+
+def has_class(name):
+    """
+    Возвращает XPath-условие на CSS-класс.
+
+    Условие повторяет правило BeautifulSoup: одиночное имя совпадает
+    с любым из классов тега, а строка из нескольких классов — только
+    со всей строкой классов целиком.
+    """
+    if ' ' in name:
+        return f"normalize-space(@class) = '{name}'"
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Предкомпилированные XPath-выражения для движка lxml. Текст узлов
+# извлекается в обычные строки: строки, которые возвращает text_content,
+# ссылаются на узел и не дают освободить дерево страницы.
+XPATH_TEXT = etree.XPath('string()', smart_strings=False)
+XPATH_WHATS_NEW_SECTION = etree.XPath(
+    "//section[@id='what-s-new-in-python']")
+XPATH_TOCTREE_WRAPPER = etree.XPath(
+    f".//div[{has_class('toctree-wrapper')}]")
+XPATH_TOCTREE_ITEMS = etree.XPath(f".//li[{has_class('toctree-l1')}]")
+XPATH_FIRST_LINK = etree.XPath('(.//a)[1]')
+XPATH_H1 = etree.XPath('//h1')
+XPATH_DL = etree.XPath('//dl')
+XPATH_SIDEBAR = etree.XPath(
+    f"//div[{has_class('sphinxsidebarwrapper')}]")
+XPATH_UL = etree.XPath('.//ul')
+XPATH_LINKS = etree.XPath('.//a')
+XPATH_DOWNLOAD_TABLE = etree.XPath(f"//table[{has_class('docutils')}]")
+XPATH_PEP_TABLES = etree.XPath(
+    f"//table[{has_class('pep-zero-table docutils align-default')}]")
+XPATH_EVEN_ROWS = etree.XPath(f".//tr[{has_class('row-even')}]")
+XPATH_FIRST_ABBR = etree.XPath('(.//abbr)[1]')
+XPATH_ABBRS = etree.XPath('.//abbr')
+XPATH_PEP_LINK = etree.XPath(
+    f"(.//a[{has_class('pep reference internal')}])[1]")
+XPATH_PEP_INFO = etree.XPath(
+    f"//dl[{has_class('rfc2822 field-list simple')}]")
+
+
+def whats_new_links_bs4(html):
+    """Реализация extract_whats_new_links на BeautifulSoup."""
+    with parsed_soup(html, parse_only=WHATS_NEW_INDEX_SCOPE) as soup:
+        main_div = find_tag(
+            soup, 'section', attrs={'id': 'what-s-new-in-python'})
+        div_with_ul = find_tag(
+            main_div, 'div', attrs={'class': 'toctree-wrapper'})
+        sections_by_python = div_with_ul.find_all('li', attrs={
+            'class': 'toctree-l1'})
+        return [section.find('a')['href'] for section in sections_by_python]
+
+
+def whats_new_links_lxml(html):
+    """Реализация extract_whats_new_links на lxml и XPath."""
+    tree = make_tree(html)
+
+    main_div = find_node(tree, XPATH_WHATS_NEW_SECTION,
+                         'section', {'id': 'what-s-new-in-python'})
+    div_with_ul = find_node(main_div, XPATH_TOCTREE_WRAPPER,
+                            'div', {'class': 'toctree-wrapper'})
+    return [
+        XPATH_FIRST_LINK(section)[0].get('href')
+        for section in XPATH_TOCTREE_ITEMS(div_with_ul)
+    ]
+
+
+def whats_new_article_bs4(html):
+    """Реализация extract_whats_new_article на BeautifulSoup."""
+    with parsed_soup(html, parse_only=WHATS_NEW_ARTICLE_SCOPE) as soup:
+        h1 = find_tag(soup, 'h1')
+        dl = find_tag(soup, 'dl')
+        dl_text = dl.text.replace('\n', ' ')
+        return h1.text, dl_text
+
+
+def whats_new_article_lxml(html):
+    """Реализация extract_whats_new_article на lxml и XPath."""
+    tree = make_tree(html)
+
+    h1 = find_node(tree, XPATH_H1, 'h1')
+    dl = find_node(tree, XPATH_DL, 'dl')
+    dl_text = XPATH_TEXT(dl).replace('\n', ' ')
+    return XPATH_TEXT(h1), dl_text
+
+
+def version_links_bs4(html):
+    """Реализация extract_version_links на BeautifulSoup."""
+    with parsed_soup(html, parse_only=LATEST_VERSIONS_SCOPE) as soup:
+        sidebar = find_tag(soup, 'div', {'class': 'sphinxsidebarwrapper'})
+        for ul in sidebar.find_all('ul'):
+            if 'All versions' in ul.text:
+                return [
+                    (a_tag['href'], a_tag.text) for a_tag in ul.find_all('a')
+                ]
+    raise DataNotFoundError('Не найдена секция с версиями')
+
+
+def version_links_lxml(html):
+    """Реализация extract_version_links на lxml и XPath."""
+    tree = make_tree(html)
+
+    sidebar = find_node(tree, XPATH_SIDEBAR,
+                        'div', {'class': 'sphinxsidebarwrapper'})
+    for ul in XPATH_UL(sidebar):
+        if 'All versions' in XPATH_TEXT(ul):
+            return [
+                (a_tag.get('href'), XPATH_TEXT(a_tag))
+                for a_tag in XPATH_LINKS(ul)
+            ]
+    raise DataNotFoundError('Не найдена секция с версиями')
+
+
+def download_links_bs4(html, formats):
+    """Реализация extract_download_links на BeautifulSoup."""
+    with parsed_soup(html, parse_only=DOWNLOAD_SCOPE) as soup:
+        table_tag = find_tag(soup, 'table', {'class': 'docutils'})
+        return [
+            find_tag(
+                table_tag, 'a', {'href': DOWNLOAD_PATTERNS[archive_format]}
+            )['href']
+            for archive_format in formats
+        ]
+
+
+def download_links_lxml(html, formats):
+    """Реализация extract_download_links на lxml и XPath."""
+    tree = make_tree(html)
+
+    table_tag = find_node(tree, XPATH_DOWNLOAD_TABLE,
+                          'table', {'class': 'docutils'})
+    hrefs = [
+        a_tag.get('href') for a_tag in XPATH_LINKS(table_tag)
+        if a_tag.get('href') is not None
+    ]
+    links = []
+    for archive_format in formats:
+        pattern = DOWNLOAD_PATTERNS[archive_format]
+        for href in hrefs:
+            if pattern.search(href):
+                links.append(href)
+                break
+        else:
+            raise_tag_not_found('a', {'href': pattern})
+    return links
+
+
+def pep_rows_bs4(html):
+    """Реализация extract_pep_rows на BeautifulSoup."""
+    with parsed_soup(html, parse_only=PEP_INDEX_SCOPE) as soup:
+        tables = find_all_tag(
+            soup, 'table', {'class': 'pep-zero-table docutils align-default'})
+        pep_rows = []
+        for table in tables:
+            for row in find_all_tag(table, 'tr', {'class': 'row-even'}):
+                abbr_tag = row.find('abbr')
+                table_pep_status = (abbr_tag.get_text(strip=True)
+                                    if abbr_tag and 'title' in abbr_tag.attrs
+                                    else None)
+
+                a_tag = row.find('a', {'class': 'pep reference internal'})
+                pep_rows.append(
+                    (table_pep_status, a_tag['href'], a_tag.get('title', '')))
+    return pep_rows
+
+
+def pep_rows_lxml(html):
+    """Реализация extract_pep_rows на lxml и XPath."""
+    tree = make_tree(html)
+
+    pep_rows = []
+    for table in XPATH_PEP_TABLES(tree):
+        for row in XPATH_EVEN_ROWS(table):
+            abbr_tags = XPATH_FIRST_ABBR(row)
+            table_pep_status = (
+                XPATH_TEXT(abbr_tags[0]).strip()
+                if abbr_tags and 'title' in abbr_tags[0].attrib
+                else None
+            )
+
+            a_tag = XPATH_PEP_LINK(row)[0]
+            pep_rows.append(
+                (table_pep_status, a_tag.get('href'), a_tag.get('title', '')))
+    return pep_rows
+
+
+def pep_card_bs4(html):
+    """Реализация extract_pep_card на BeautifulSoup."""
+    with parsed_soup(html, parse_only=PEP_CARD_SCOPE) as soup:
+        pep_info = find_tag(
+            soup, 'dl', {'class': 'rfc2822 field-list simple'})
+
+        pep_info_list = find_all_tag(pep_info, 'abbr')
+        pep_status = pep_info_list[0].get_text(strip=True)
+        pep_type = pep_info_list[1].get_text(strip=True)
+
+        title_tag = soup.find('h1')
+        pep_title = title_tag.get_text(strip=True) if title_tag else ''
+    return pep_status, pep_type, pep_title
+
+
+def pep_card_lxml(html):
+    """Реализация extract_pep_card на lxml и XPath."""
+    tree = make_tree(html)
+
+    pep_info = find_node(tree, XPATH_PEP_INFO,
+                         'dl', {'class': 'rfc2822 field-list simple'})
+
+    pep_info_list = XPATH_ABBRS(pep_info)
+    pep_status = XPATH_TEXT(pep_info_list[0]).strip()
+    pep_type = XPATH_TEXT(pep_info_list[1]).strip()
+
+    title_tags = XPATH_H1(tree)
+    pep_title = XPATH_TEXT(title_tags[0]).strip() if title_tags else ''
+    return pep_status, pep_type, pep_title
+
+
+def extract_whats_new_links(html, engine=ENGINE_BS4):
+    """Извлекает ссылки на статьи из оглавления раздела What's New."""
+    if engine == ENGINE_LXML:
+        return whats_new_links_lxml(html)
+    return whats_new_links_bs4(html)
+
+
+def extract_whats_new_article(html, engine=ENGINE_BS4):
+    """Извлекает заголовок и сведения об авторах из статьи о версии."""
+    if engine == ENGINE_LXML:
+        return whats_new_article_lxml(html)
+    return whats_new_article_bs4(html)
+
+
+def extract_version_links(html, engine=ENGINE_BS4):
+    """Извлекает ссылки и подписи из списка версий на боковой панели."""
+    if engine == ENGINE_LXML:
+        return version_links_lxml(html)
+    return version_links_bs4(html)
+
+
+def extract_download_links(html, formats, engine=ENGINE_BS4):
+    """
+    Извлекает ссылки на архивы документации в заданных форматах.
+
+    Ссылки возвращаются в порядке formats; названия форматов —
+    ключи DOWNLOAD_FORMATS.
+    """
+    if engine == ENGINE_LXML:
+        return download_links_lxml(html, formats)
+    return download_links_bs4(html, formats)
+
+
+def extract_pep_rows(html, engine=ENGINE_BS4):
+    """
+    Извлекает строки таблиц индекса PEP.
+
+    Для каждой строки возвращает статус в индексе, ссылку на карточку
+    и заголовок PEP.
+    """
+    if engine == ENGINE_LXML:
+        return pep_rows_lxml(html)
+    return pep_rows_bs4(html)
+
+
+def extract_pep_card(html, engine=ENGINE_BS4):
+    """Извлекает статус, тип и заголовок из карточки PEP."""
+    if engine == ENGINE_LXML:
+        return pep_card_lxml(html)
+    return pep_card_bs4(html)
@@ -1,176 +1,626 @@
+import datetime as dt
+import hashlib
 import logging
 import re
+from collections import Counter
+from contextlib import closing
+from functools import partial
 from urllib.parse import urljoin
 
-import requests_cache
-from tqdm import tqdm
+from constants import (BASE_DIR, CACHE_STATS_LARGEST, CHECKPOINT_FILE_SUFFIX,
+                       DATETIME_FORMAT,
+                       DEFAULT_DOWNLOAD_FORMAT, DEFAULT_WORKERS,
+                       DOWNLOAD_SEGMENTS, DOWNLOADS_DIR_NAME, ENGINE_BS4,
+                       EXPECTED_STATUS, MAIN_DOC_URL, MAIN_PEP_URL,
+                       PEP_SHARD_STATE_FILE_NAME, PEP_STATE_FILE_NAME,
+                       PEP_STORE_FILE_NAME,
+                       SERVE_HOST, SERVE_PORT, SERVE_REFRESH_INTERVAL,
+                       SHARDS_DIR_NAME, SNAPSHOTS_DIR_NAME, STATE_DIR_NAME)
+from configs import (configure_argument_parser, configure_logging,
+                     configure_scheduler, configure_session)
+from checkpoint import Checkpoint, checkpointed
+from exceptions import PageLoadError
+from metrics import METRICS
+from outputs import control_output, metrics_output
+from records import (PepCard, PepIndexRow, PepRecord, VersionEntry,
+                     WhatsNewArticle, count_by, counter_rows)
+from state import load_state, save_state
+from utils import (extract_pages, get_response, map_concurrently,
+                   streamable)
+
+# Тяжёлые зависимости (requests_cache, bs4, lxml, tqdm, prettytable)
+# импортируются внутри функций режимов и вывода, которым они нужны:
+# запуск с --help и лёгкие режимы не тратят время на их загрузку.
+
+PEP_NUMBER_PATTERN = re.compile(r'pep-(\d+)')
+
+# Что произошло с записью кеша при загрузке страницы в режиме prefetch
+PREFETCH_NEW = 'new'
+PREFETCH_REFRESHED = 'refreshed'
+PREFETCH_UNCHANGED = 'unchanged'
+
+
+def checkpoint_path(run_name):
+    """Путь к журналу обработанных страниц прогона run_name."""
+    return BASE_DIR / STATE_DIR_NAME / (run_name + CHECKPOINT_FILE_SUFFIX)
+
+
+def pep_state_path(shard=None):
+    """
+    Путь к состоянию инкрементального режима pep.
+
+    У каждого шарда своё состояние: шарды, в том числе запущенные
+    параллельно, не затирают состояние друг друга и полного прогона.
+    """
+    if shard is None:
+        return BASE_DIR / STATE_DIR_NAME / PEP_STATE_FILE_NAME
+    return BASE_DIR / STATE_DIR_NAME / PEP_SHARD_STATE_FILE_NAME.format(
+        *shard)
+
+
+@streamable
+def whats_new(session, workers=DEFAULT_WORKERS, parse_workers=0,
+              engine=ENGINE_BS4, resume=False, checkpoint=True):
+    """
+    Получает ссылки на статьи о новых версиях Python.
+
+    Обработанные статьи записываются в журнал прогона. С аргументом
+    resume=True статьи, обработанные прерванным прогоном, берутся
+    из журнала, а загружаются только остальные. С checkpoint=False
+    журнал не ведётся.
+    """
+    from tqdm import tqdm
+
+    from extractors import extract_whats_new_article, extract_whats_new_links
+
+    yield WhatsNewArticle.HEADER
 
-from constants import (BASE_DIR, DOWNLOADS_DIR_NAME, EXPECTED_STATUS,
-                       MAIN_DOC_URL, MAIN_PEP_URL)
-from configs import configure_argument_parser, configure_logging
-from exceptions import DataNotFoundError, PageLoadError
-from outputs import control_output
-from utils import fetch_soup, find_all_tag, find_tag
-
-
-def whats_new(session):
-    """Получает ссылки на статьи о новых версиях Python."""
     whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
-    soup = fetch_soup(session, whats_new_url)
+    html = get_response(session, whats_new_url).text
+    with METRICS.page(whats_new_url):
+        hrefs = extract_whats_new_links(html, engine)
 
-    main_div = find_tag(
-        soup, 'section', attrs={'id': 'what-s-new-in-python'})
-    div_with_ul = find_tag(main_div, 'div', attrs={'class': 'toctree-wrapper'})
-    sections_by_python = div_with_ul.find_all('li', attrs={
-        'class': 'toctree-l1'})
+    version_links = [urljoin(whats_new_url, href) for href in hrefs]
 
-    results = [('Ссылка на статью', 'Заголовок', 'Редактор, автор'), ]
     log_messages = []
 
-    for section in tqdm(sections_by_python):
-        version_a_tag = section.find('a')
-
-        href = version_a_tag['href']
-        version_link = urljoin(whats_new_url, href)
-
-        try:
-            soup = fetch_soup(session, version_link)
-        except PageLoadError as e:
-            log_messages.append("Ошибка загрузки страницы "
-                                f"{version_link}: {e}")
-            continue
-
-        h1 = find_tag(soup, 'h1')
-        dl = find_tag(soup, 'dl')
-        dl_text = dl.text.replace('\n', ' ')
-        results.append((version_link, h1.text, dl_text))
+    with Checkpoint(checkpoint_path('whats-new') if checkpoint else None,
+                    resume) as journal:
+        articles = checkpointed(journal, version_links, partial(
+            extract_pages, session,
+            extract=partial(extract_whats_new_article, engine=engine),
+            workers=workers, parse_workers=parse_workers))
+
+        for version_link, article in tqdm(
+                zip(version_links, articles), total=len(version_links)):
+            if isinstance(article, PageLoadError):
+                log_messages.append("Ошибка загрузки страницы "
+                                    f"{version_link}: {article}")
+                continue
+            yield WhatsNewArticle(version_link, *article)
 
     if log_messages:
         logging.error(
             "Ошибки при загрузке страниц:\n" + "\n".join(log_messages))
 
-    return results
-
 
-def latest_versions(session):
+@streamable
+def latest_versions(session, engine=ENGINE_BS4):
     """Получает список всех версий Python и их статусы."""
-    soup = fetch_soup(session, MAIN_DOC_URL)
-
-    sidebar = find_tag(soup, 'div', {'class': 'sphinxsidebarwrapper'})
-    ul_tags = sidebar.find_all('ul')
+    from extractors import extract_version_links
 
-    for ul in ul_tags:
-        if 'All versions' in ul.text:
-            a_tags = ul.find_all('a')
-            break
-    else:
-        raise DataNotFoundError('Не найдена секция с версиями')
+    html = get_response(session, MAIN_DOC_URL).text
+    with METRICS.page(MAIN_DOC_URL):
+        version_links = extract_version_links(html, engine)
 
-    results = [('Ссылка', 'Версия', 'Статус')]
+    yield VersionEntry.HEADER
     pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
-    for a_tag in a_tags:
-        link = a_tag['href']
-        text_match = re.search(pattern, a_tag.text)
+    for link, text in version_links:
+        text_match = re.search(pattern, text)
         if text_match is not None:
             version, status = text_match.groups()
         else:
-            version, status = a_tag.text, ''
-        results.append(
-            (link, version, status)
-        )
+            version, status = text, ''
+        yield VersionEntry.make(link, version, status)
 
-    return results
 
+def download(session, engine=ENGINE_BS4,
+             formats=(DEFAULT_DOWNLOAD_FORMAT,), workers=DEFAULT_WORKERS,
+             segments=DOWNLOAD_SEGMENTS):
+    """
+    Скачивает архивы с последней версией документации Python.
 
-def download(session):
-    """Скачивает архив с последней версией документации Python."""
-    downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
-    soup = fetch_soup(session, downloads_url)
+    По умолчанию скачивается PDF-архив формата A4; архивы в нескольких
+    форматах скачиваются параллельно.
+    """
+    from downloads import download_archives
+    from extractors import extract_download_links
 
-    table_tag = find_tag(soup, 'table', {'class': 'docutils'})
-    pdf_a4_tag = find_tag(
-        table_tag, 'a', {'href': re.compile(r'.+pdf-a4\.zip$')})
-    pdf_a4_link = pdf_a4_tag['href']
-    archive_url = urljoin(downloads_url, pdf_a4_link)
+    downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
+    html = get_response(session, downloads_url).text
+    with METRICS.page(downloads_url):
+        links = extract_download_links(html, formats, engine)
 
-    filename = archive_url.split('/')[-1]
+    archive_urls = [urljoin(downloads_url, link) for link in links]
 
     downloads_dir = BASE_DIR / DOWNLOADS_DIR_NAME
     downloads_dir.mkdir(exist_ok=True)
-    archive_path = downloads_dir / filename
+    archives = [
+        (archive_url, downloads_dir / archive_url.split('/')[-1])
+        for archive_url in archive_urls
+    ]
 
-    response = session.get(archive_url)
+    download_archives(session, archives, workers, segments)
 
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
 
-    logging.info(f'Архив был загружен и сохранён: {archive_path}')
+def pep_row_fingerprint(table_pep_status, pep_url, pep_title):
+    """Вычисляет отпечаток строки индекса PEP."""
+    row = '\x1f'.join((table_pep_status or '', pep_url, pep_title))
+    return hashlib.sha1(row.encode('utf-8')).hexdigest()
 
 
-def pep(session):
-    """Получает информацию о PEP (Python Enhancement Proposals)."""
-    peps_url = urljoin(MAIN_PEP_URL, '#numerical-index')
-    soup = fetch_soup(session, peps_url)
+def pep_number(pep_url):
+    """Извлекает номер PEP из ссылки на карточку."""
+    match = PEP_NUMBER_PATTERN.search(pep_url)
+    return int(match.group(1)) if match else None
+
+
+def pep_status_mismatch(table_pep_status, pep_url, pep_status, pep_type):
+    """
+    Сверяет статус PEP в индексе со статусом в карточке.
+
+    Возвращает сообщение о несовпадении или None, если статусы совпадают.
+    """
+    if not table_pep_status or len(table_pep_status) < 2:
+        return (
+            f'Несовпадающие статусы: {pep_url} \n'
+            'Статус в карточке: Some unknown status \n'
+            f'Ожидаемые статусы: {pep_type, pep_status}'
+        )
+    if pep_status not in EXPECTED_STATUS[table_pep_status[1]]:
+        return (
+            f'Несовпадающие статусы: {pep_url} \n'
+            f'Статус в карточке: {table_pep_status} \n'
+            f'Ожидаемые статусы: {[pep_type, pep_status]}'
+        )
+    return None
 
-    tables = find_all_tag(soup, 'table',
-                          {'class': 'pep-zero-table docutils align-default'})
 
-    result_dict = {}
+def fetch_pep_cards(session, pep_urls, workers, parse_workers, engine,
+                    checkpoint=None):
+    """
+    Загружает карточки PEP и извлекает из них статус, тип и заголовок.
+
+    Возвращает словарь записей PepCard по URL и список сообщений
+    об ошибках загрузки. Если передан журнал прогона checkpoint,
+    карточки из него не загружаются, а загруженные записываются в него.
+    """
+    from tqdm import tqdm
+
+    from extractors import extract_pep_card
+
+    pep_cards = {}
     log_messages = []
 
-    for table in tqdm(tables):
-        rows = find_all_tag(table, 'tr', {'class': 'row-even'})
+    extract_pending = partial(
+        extract_pages,
+        session,
+        extract=partial(extract_pep_card, engine=engine),
+        workers=workers,
+        parse_workers=parse_workers
+    )
+    extracted = (
+        extract_pending(pep_urls) if checkpoint is None
+        else checkpointed(checkpoint, pep_urls, extract_pending)
+    )
+
+    for pep_url, pep_card in tqdm(
+            zip(pep_urls, extracted), total=len(pep_urls)):
+        if isinstance(pep_card, PageLoadError):
+            log_messages.append(
+                f"Ошибка загрузки страницы {pep_url}: {pep_card}")
+            continue
+        pep_cards[pep_url] = PepCard.make(*pep_card)
+
+    return pep_cards, log_messages
+
+
+def collect_pep_cards(session, fingerprints, workers, parse_workers, engine,
+                      state_path, checkpoint):
+    """
+    Собирает карточки PEP для строк индекса с отпечатками fingerprints.
+
+    В инкрементальном режиме (state_path — путь к файлу состояния, а не
+    None) карточки неизменившихся строк берутся из сохранённого
+    состояния, а состояние обновляется после загрузки.
+    Возвращает словарь записей PepCard по URL и список сообщений
+    об ошибках загрузки.
+    """
+    incremental = state_path is not None
+    state = load_state(state_path) if incremental else {}
+    pep_cards = {
+        pep_url: PepCard.make(*entry['card'])
+        for pep_url, entry in state.items()
+        if entry.get('fingerprint') == fingerprints.get(pep_url)
+    }
+
+    fetched_cards, log_messages = fetch_pep_cards(
+        session,
+        [pep_url for pep_url in fingerprints if pep_url not in pep_cards],
+        workers,
+        parse_workers,
+        engine,
+        checkpoint
+    )
+    pep_cards.update(fetched_cards)
+
+    if incremental:
+        save_state(state_path, {
+            pep_url: {'fingerprint': fingerprints[pep_url], 'card': card}
+            for pep_url, card in pep_cards.items()
+        })
+        logging.info(
+            f'Загружено карточек PEP: {len(fetched_cards)}, '
+            f'взято из состояния: {len(pep_cards) - len(fetched_cards)}')
+    return pep_cards, log_messages
+
+
+def check_pep_records(pep_rows, pep_cards):
+    """
+    Сверяет строки индекса PEP с карточками.
+
+    Возвращает записи PepRecord для строк, карточки которых загружены,
+    и пары (URL, сообщение) о несовпадении статусов.
+    """
+    records = []
+    mismatches = []
+    checked_at = dt.datetime.now().isoformat(timespec='seconds')
+
+    for row in pep_rows:
+        card = pep_cards.get(row.url)
+        if card is None:
+            continue
 
-        for row in rows:
-            abbr_tag = row.find('abbr')
-            table_pep_status = (abbr_tag.get_text(strip=True)
-                                if abbr_tag and 'title' in abbr_tag.attrs
-                                else None)
+        mismatch = pep_status_mismatch(
+            row.table_status, row.url, card.status, card.type)
+        if mismatch is not None:
+            mismatches.append((row.url, mismatch))
+        records.append(PepRecord(
+            row.url, pep_number(row.url), row.title, row.table_status,
+            card.status, card.type, mismatch is not None, checked_at
+        ))
+    return records, mismatches
+
+
+@streamable
+def pep(session, workers=DEFAULT_WORKERS, parse_workers=0,
+        engine=ENGINE_BS4, incremental=False, store=False, shard=None,
+        shard_dir=None, resume=False, checkpoint=True):
+    """
+    Получает информацию о PEP (Python Enhancement Proposals).
+
+    С аргументом store=True записи о каждом PEP (номер, заголовок, статусы
+    в индексе и в карточке, тип, признак несовпадения статусов)
+    сохраняются в базу SQLite для режима query.
+
+    С аргументом shard=(i, N) обрабатываются только PEP i-го из N шардов;
+    шард определяется по URL карточки. Сводка выводится по шарду, а для
+    режима merge она сохраняется в shard_dir (по умолчанию shards/).
+
+    В инкрементальном режиме загружаются только карточки PEP, строки
+    которых в индексе изменились с прошлого запуска или появились впервые;
+    данные остальных карточек берутся из сохранённого состояния
+    (у каждого шарда своё).
+    Сводка по статусам известна только после обработки всех карточек,
+    поэтому при потоковом выводе строки сводки идут после заголовка
+    в самом конце.
+
+    Загруженные карточки записываются в журнал прогона. С аргументом
+    resume=True карточки, загруженные прерванным прогоном (того же
+    шарда), берутся из журнала, а загружаются только остальные.
+    С checkpoint=False журнал не ведётся.
+    """
+    from extractors import extract_pep_rows
+
+    yield ('Статус', 'Количество')
 
-            a_tag = row.find('a', {'class': 'pep reference internal'})
-            href = a_tag['href']
+    peps_url = urljoin(MAIN_PEP_URL, '#numerical-index')
+    html = get_response(session, peps_url).text
+    with METRICS.page(peps_url):
+        extracted_rows = extract_pep_rows(html, engine)
+
+    index_rows = [
+        PepIndexRow.make(table_pep_status, urljoin(MAIN_PEP_URL, href),
+                         pep_title)
+        for table_pep_status, href, pep_title in extracted_rows
+    ]
+    pep_rows = index_rows
+    if shard is not None:
+        from shards import select_shard
+
+        pep_rows = select_shard(index_rows, shard)
+    fingerprints = {
+        row.url: pep_row_fingerprint(*row) for row in pep_rows
+    }
+
+    run_name = 'pep' if shard is None else 'pep_{}-of-{}'.format(*shard)
+    with Checkpoint(checkpoint_path(run_name) if checkpoint else None,
+                    resume) as journal:
+        pep_cards, log_messages = collect_pep_cards(
+            session, fingerprints, workers, parse_workers, engine,
+            pep_state_path(shard) if incremental else None, journal)
+
+    records, mismatches = check_pep_records(pep_rows, pep_cards)
+    log_messages.extend(message for _, message in mismatches)
+
+    if shard is not None:
+        from shards import save_shard, shard_summary
+
+        shard_path = save_shard(
+            shard_dir or BASE_DIR / SHARDS_DIR_NAME, shard,
+            shard_summary(shard, index_rows, records, mismatches))
+        logging.info(f'Результат шарда был сохранён: {shard_path}')
+
+    if store:
+        from store import open_store, save_pep_records
+
+        with closing(open_store(
+                BASE_DIR / STATE_DIR_NAME / PEP_STORE_FILE_NAME)) as db:
+            saved = save_pep_records(db, records)
+        logging.info(f'Сохранено записей PEP в базу: {saved}')
 
-            pep_url = urljoin(MAIN_PEP_URL, href)
+    if log_messages:
+        logging.info("Найдены несовпадающие статусы:\n"
+                     + "\n".join(log_messages))
 
-            try:
-                soup = fetch_soup(session, pep_url)
-            except PageLoadError as e:
-                log_messages.append(f"Ошибка загрузки страницы {pep_url}: {e}")
-                continue
+    yield from counter_rows(count_by(records, 'status'))
 
-            pep_info = find_tag(soup, 'dl',
-                                {'class': 'rfc2822 field-list simple'})
 
-            pep_info_list = find_all_tag(pep_info, 'abbr')
-            pep_status = pep_info_list[0].get_text(strip=True)
-            pep_type = pep_info_list[1].get_text(strip=True)
+@streamable
+def merge(session, shard_dir=None):
+    """
+    Сливает результаты шардов pep в итоговую сводку по статусам.
 
-            result_dict[pep_status] = result_dict.get(pep_status, 0) + 1
+    Результаты читаются из shard_dir (по умолчанию shards/); сводка
+    совпадает с выводом pep без шардов. Сессия не используется.
+    """
+    from shards import load_shards, merge_shards
 
-            if not table_pep_status or len(table_pep_status) < 2:
-                log_messages.append(
-                    f'Несовпадающие статусы: {pep_url} \n'
-                    'Статус в карточке: Some unknown status \n'
-                    f'Ожидаемые статусы: {pep_type, pep_status}'
-                )
-            elif pep_status not in EXPECTED_STATUS[table_pep_status[1]]:
+    statuses, mismatches = merge_shards(
+        load_shards(shard_dir or BASE_DIR / SHARDS_DIR_NAME))
+    if mismatches:
+        logging.info("Найдены несовпадающие статусы:\n"
+                     + "\n".join(mismatches))
+
+    yield ('Статус', 'Количество')
+    yield from counter_rows(statuses)
+
+
+@streamable
+def query(session, status=None, pep_type=None, mismatches=False,
+          since=None):
+    """
+    Выбирает записи PEP из базы, сохранённой режимом pep с --store.
+
+    Запрос выполняется по локальной базе SQLite без обращения к сети,
+    сессия не используется.
+    """
+    from store import open_store, query_peps
+
+    yield ('Номер', 'Статус', 'Тип', 'Заголовок', 'Ссылка')
+
+    store_path = BASE_DIR / STATE_DIR_NAME / PEP_STORE_FILE_NAME
+    if not store_path.exists():
+        logging.warning(
+            f'База {store_path} не найдена: сначала выполните pep --store')
+        return
+    with closing(open_store(store_path)) as db:
+        yield from query_peps(db, status, pep_type, mismatches,
+                              since and since.isoformat())
+
+
+@streamable
+def cache_stats(session, largest=CACHE_STATS_LARGEST):
+    """
+    Выводит сводку по кешу HTTP-запросов.
+
+    Сводка содержит количество записей, их общий размер на диске,
+    попадания и промахи за всё время работы с кешем и размеры largest
+    крупнейших записей.
+    """
+    from cache import collect_cache_stats
+
+    stats = collect_cache_stats(session, largest)
+    requests_count = stats['hits'] + stats['misses']
+    hit_ratio = stats['hits'] / requests_count if requests_count else 0
+
+    yield ('Показатель', 'Значение')
+    yield ('Записей', stats['entries'])
+    yield ('Размер, байт', stats['bytes'])
+    yield ('Попаданий', stats['hits'])
+    yield ('Промахов', stats['misses'])
+    yield ('Доля попаданий', f'{hit_ratio:.1%}')
+    yield from stats['largest']
+
+
+def fetch_response(session, url):
+    """Загружает страницу; при ошибке возвращает объект PageLoadError."""
+    try:
+        return get_response(session, url)
+    except PageLoadError as e:
+        return e
+
+
+def site_index_urls():
+    """Перечисляет индексные страницы режимов парсера."""
+    return [
+        urljoin(MAIN_DOC_URL, 'whatsnew/'),
+        MAIN_DOC_URL,
+        urljoin(MAIN_DOC_URL, 'download.html'),
+        urljoin(MAIN_PEP_URL, '#numerical-index'),
+    ]
+
+
+def site_linked_urls(index_pages, engine):
+    """
+    Перечисляет статьи о версиях и карточки PEP по индексным страницам.
+
+    index_pages — словарь текстов индексных страниц по URL; страниц,
+    которые не удалось загрузить, в нём нет.
+    """
+    from extractors import extract_pep_rows, extract_whats_new_links
+
+    whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
+    peps_url = urljoin(MAIN_PEP_URL, '#numerical-index')
+    urls = []
+    if whats_new_url in index_pages:
+        urls.extend(
+            urljoin(whats_new_url, href)
+            for href in extract_whats_new_links(
+                index_pages[whats_new_url], engine)
+        )
+    if peps_url in index_pages:
+        urls.extend(
+            urljoin(MAIN_PEP_URL, href)
+            for _, href, _ in extract_pep_rows(index_pages[peps_url], engine)
+        )
+    return list(dict.fromkeys(urls))
+
+
+def crawl_site(session, workers, engine, log_messages):
+    """
+    Загружает страницы, которые нужны режимам парсера.
+
+    Сначала загружаются индексные страницы всех режимов, затем
+    параллельно — статьи о версиях и карточки PEP с индикатором прогресса.
+    Генерирует пары (URL, ответ); сообщения об ошибках загрузки
+    добавляются в log_messages.
+    """
+    from tqdm import tqdm
+
+    def load(urls):
+        responses = map_concurrently(
+            partial(fetch_response, session), urls, workers)
+        for url, response in zip(urls, responses):
+            if isinstance(response, PageLoadError):
                 log_messages.append(
-                    f'Несовпадающие статусы: {pep_url} \n'
-                    f'Статус в карточке: {table_pep_status} \n'
-                    f'Ожидаемые статусы: {[pep_type, pep_status]}'
-                )
+                    f'Ошибка загрузки страницы {url}: {response}')
+                continue
+            yield url, response
+
+    index_pages = {}
+    for url, response in load(site_index_urls()):
+        index_pages[url] = response.text
+        yield url, response
+
+    linked_urls = site_linked_urls(index_pages, engine)
+    yield from tqdm(load(linked_urls), total=len(linked_urls))
+
 
-        result = list(result_dict.items())
+@streamable
+def prefetch(session, workers=DEFAULT_WORKERS, engine=ENGINE_BS4):
+    """
+    Заполняет кеш страницами, которые загружают режимы парсера.
+
+    Выводит количество новых, обновлённых и не изменившихся записей
+    кеша и ошибок загрузки. Архивы документации в кеш не попадают.
+    """
+    known_keys = set(session.cache.responses.keys())
+    statuses = Counter()
+    log_messages = []
+    for _, response in crawl_site(session, workers, engine, log_messages):
+        if getattr(response, 'from_cache', False):
+            statuses[PREFETCH_UNCHANGED] += 1
+        elif response.cache_key in known_keys:
+            statuses[PREFETCH_REFRESHED] += 1
+        else:
+            statuses[PREFETCH_NEW] += 1
 
     if log_messages:
-        logging.info("Найдены несовпадающие статусы:\n"
-                     + "\n".join(log_messages))
+        logging.error(
+            "Ошибки при загрузке страниц:\n" + "\n".join(log_messages))
+
+    yield ('Записи кеша', 'Страниц')
+    yield ('Новые', statuses[PREFETCH_NEW])
+    yield ('Обновлённые', statuses[PREFETCH_REFRESHED])
+    yield ('Без изменений', statuses[PREFETCH_UNCHANGED])
+    yield ('Ошибки загрузки', len(log_messages))
+    yield ('Total', sum(statuses.values()) + len(log_messages))
+
+
+@streamable
+def snapshot(session, workers=DEFAULT_WORKERS, engine=ENGINE_BS4,
+             snapshot_path=None):
+    """
+    Сохраняет страницы всех режимов парсера в один файл снимка.
+
+    Набор страниц тот же, что в режиме prefetch. По умолчанию снимок
+    сохраняется в snapshots/site_<дата>.snap; воспроизводится он
+    аргументом --replay.
+    """
+    from snapshot import SnapshotWriter
 
-    header = [('Статус', 'Количество')]
-    total = [('Total', sum(result_dict.values()))]
-    result_list = header + result + total
+    if snapshot_path is None:
+        now_formatted = dt.datetime.now().strftime(DATETIME_FORMAT)
+        snapshot_path = (
+            BASE_DIR / SNAPSHOTS_DIR_NAME / f'site_{now_formatted}.snap')
 
-    return result_list
+    log_messages = []
+    with SnapshotWriter(snapshot_path) as writer:
+        for url, response in crawl_site(
+                session, workers, engine, log_messages):
+            writer.add(url, response)
+
+    if log_messages:
+        logging.error(
+            "Ошибки при загрузке страниц:\n" + "\n".join(log_messages))
+    logging.info(f'Снимок страниц был сохранён: {snapshot_path}')
+
+    yield ('Файл снимка', 'Страниц', 'Ошибки загрузки', 'Размер, байт')
+    yield (str(snapshot_path), len(writer.index), len(log_messages),
+           snapshot_path.stat().st_size)
+
+
+def served_modes(session, workers=DEFAULT_WORKERS, parse_workers=0,
+                 engine=ENGINE_BS4):
+    """
+    Сопоставляет режимам, результаты которых отдаёт serve, их вызовы.
+
+    Журналы прогонов не ведутся: обновления индекса не продолжаются
+    после прерывания, а общий журнал затирал бы журнал прогона из
+    командной строки.
+    """
+    return {
+        'pep': partial(pep, session, workers, parse_workers, engine,
+                       checkpoint=False),
+        'latest-versions': partial(latest_versions, session, engine),
+        'whats-new': partial(whats_new, session, workers, parse_workers,
+                             engine, checkpoint=False),
+    }
+
+
+def serve(session, workers=DEFAULT_WORKERS, parse_workers=0,
+          engine=ENGINE_BS4, host=SERVE_HOST, port=SERVE_PORT,
+          socket_path=None, refresh_interval=SERVE_REFRESH_INTERVAL):
+    """
+    Отдаёт результаты режимов pep, latest-versions и whats-new по HTTP.
+
+    Результаты хранятся в памяти и обновляются в фоне раз
+    в refresh_interval секунд одной сессией, страницы которой остаются
+    в кеше между обновлениями. После каждого обновления из кеша
+    удаляются записи сверх предела, а журнал обращений к ним
+    записывается на диск. Запросы принимаются на host:port или
+    через Unix-сокет socket_path до прерывания процесса.
+    """
+    from server import ResultIndex, run_server
+
+    index = ResultIndex(
+        served_modes(session, workers, parse_workers, engine))
+    # Сессия снимка (--replay) не кеширует страницы
+    after_refresh = (
+        partial(trim_cache, session) if hasattr(session, 'trim') else None)
+    run_server(index, host, port, socket_path, refresh_interval,
+               after_refresh)
 
 
 MODE_TO_FUNCTION = {
@@ -180,6 +630,64 @@ MODE_TO_FUNCTION = {
     'pep': pep,
 }
 
+# Аргументы командной строки, которые передаются в функции режимов
+MODE_TO_OPTIONS = {
+    'whats-new': ('workers', 'parse_workers', 'engine', 'resume', 'stream'),
+    'latest-versions': ('engine', 'stream'),
+    'download': ('engine', 'formats', 'workers', 'segments'),
+    'pep': ('workers', 'parse_workers', 'engine', 'incremental', 'store',
+            'shard', 'shard_dir', 'resume', 'stream'),
+    'merge': ('shard_dir', 'stream'),
+    'query': ('status', 'pep_type', 'mismatches', 'since', 'stream'),
+    'cache-stats': ('largest', 'stream'),
+    'prefetch': ('workers', 'engine', 'stream'),
+    'snapshot': ('workers', 'engine', 'snapshot_path', 'stream'),
+    'serve': ('workers', 'parse_workers', 'engine', 'host', 'port',
+              'socket_path', 'refresh_interval'),
+}
+
+# Служебные режимы: работают с локальными данными парсера
+SERVICE_MODE_TO_FUNCTION = {
+    'query': query,
+    'merge': merge,
+    'cache-stats': cache_stats,
+    'prefetch': prefetch,
+    'snapshot': snapshot,
+    'serve': serve,
+}
+
+# Режимы, которые работают только с файлами парсера и не обращаются
+# к сети: для них не создаются сессия и кеш HTTP-запросов
+LOCAL_MODES = frozenset({'query', 'merge'})
+# Режимы, которые работают с кешем HTTP-запросов: у сессии снимка
+# (--replay) кеша нет
+CACHE_MODES = frozenset({'cache-stats', 'prefetch'})
+
+
+def prepare_session(args):
+    """
+    Создаёт сессию и настраивает планировщик запросов для режима.
+
+    Для режимов из LOCAL_MODES возвращает None: кеш не открывается,
+    и requests с requests_cache не загружаются.
+    """
+    if args.mode in LOCAL_MODES:
+        return None
+    session = configure_session(args)
+    configure_scheduler(args)
+    if args.clear_cache and args.replay is None:
+        session.cache.clear()
+    return session
+
+
+def trim_cache(session):
+    """Удаляет из кеша давно не использованные записи сверх предела."""
+    evicted, freed = session.trim()
+    if evicted:
+        logging.info(
+            f'Из кеша удалено записей: {evicted}, '
+            f'освобождено {freed / 2 ** 20:.1f} МБ')
+
 
 def main():
     """Основная функция запуска парсера."""
@@ -187,20 +695,32 @@ def main():
         configure_logging()
         logging.info('Парсер запущен!')
 
-        arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+        modes = {**MODE_TO_FUNCTION, **SERVICE_MODE_TO_FUNCTION}
+        arg_parser = configure_argument_parser(modes.keys())
         args = arg_parser.parse_args()
+        if args.replay is not None and args.mode in CACHE_MODES:
+            arg_parser.error(
+                f'режим {args.mode} работает с кешем и несовместим '
+                'с --replay')
 
         logging.info(f'Аргументы командной строки: {args}')
 
-        session = requests_cache.CachedSession()
-        if args.clear_cache:
-            session.cache.clear()
+        session = prepare_session(args)
 
         parser_mode = args.mode
-        results = MODE_TO_FUNCTION[parser_mode](session)
+        options = {
+            option: getattr(args, option)
+            for option in MODE_TO_OPTIONS.get(parser_mode, ())
+        }
+        results = modes[parser_mode](session, **options)
 
         if results is not None:
             control_output(results, args)
+        if args.metrics:
+            metrics_output(args)
+
+        if session is not None and args.replay is None:
+            trim_cache(session)
     except Exception as e:
         logging.exception('Возникло исключение во время '
                           f'работы парсера: {e}')
@@ -0,0 +1,141 @@
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Метрики, которые суммируются по каждому URL
+TIMINGS = ('wait_seconds', 'fetch_seconds', 'parse_seconds',
+           'extract_seconds')
+# Счётчики, которые суммируются по всем URL
+COUNTERS = ('retries', 'failures')
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def percentile(values, fraction):
+    """Вычисляет перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Metrics:
+    """
+    Собирает метрики загрузки и разбора страниц по URL.
+
+    Для каждого URL хранятся время ожидания разрешения на запрос
+    и пауз перед повторами, время загрузки, признак попадания в кеш,
+    размер ответа, полученного по сети, время построения дерева и время
+    извлечения данных. Методы потокобезопасны.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.pages = {}
+
+    def reset(self):
+        """Очищает собранные метрики."""
+        with self.lock:
+            self.pages = {}
+
+    def value(self, url, name):
+        """Возвращает накопленное значение метрики для URL."""
+        with self.lock:
+            return self.pages.get(url, {}).get(name, 0)
+
+    def record(self, url, from_cache=None, **values):
+        """Добавляет значения метрик для URL."""
+        with self.lock:
+            page = self.pages.setdefault(url, {})
+            for name, value in values.items():
+                page[name] = page.get(name, 0) + value
+            if from_cache is not None:
+                page['from_cache'] = from_cache
+
+    @contextmanager
+    def page(self, url):
+        """
+        Привязывает обработку страницы в текущем потоке к URL.
+
+        Время разбора, замеренное через timed без явного URL, будет
+        записано для этой страницы. Всё время обработки, кроме разбора,
+        считается временем извлечения данных.
+        """
+        self.local.url = url
+        parse_before = self.value(url, 'parse_seconds')
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            parse_seconds = self.value(url, 'parse_seconds') - parse_before
+            self.record(url, extract_seconds=elapsed - parse_seconds)
+            self.local.url = None
+
+    @contextmanager
+    def timed(self, name, url=None):
+        """Замеряет время блока и добавляет его к метрике name."""
+        url = url or getattr(self.local, 'url', None)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if url is not None:
+                self.record(url, **{name: time.perf_counter() - started})
+
+    def summary(self):
+        """Сводит метрики страниц в перцентили и итоговые счётчики."""
+        with self.lock:
+            pages = [dict(page) for page in self.pages.values()]
+        cached = [page['from_cache'] for page in pages if 'from_cache' in page]
+        summary = {
+            'pages': len(pages),
+            'cache_hits': sum(cached),
+            'cache_misses': len(cached) - sum(cached),
+            'bytes_received': sum(page.get('bytes', 0) for page in pages),
+        }
+        for name in COUNTERS:
+            summary[name] = sum(page.get(name, 0) for page in pages)
+        for name in TIMINGS:
+            values = [page[name] for page in pages if name in page]
+            if not values:
+                continue
+            summary[name] = {
+                f'p{round(fraction * 100)}': percentile(values, fraction)
+                for fraction in PERCENTILES
+            }
+            summary[name]['max'] = max(values)
+            summary[name]['sum'] = sum(values)
+            summary[name]['count'] = len(values)
+        return summary
+
+
+METRICS = Metrics()
+
+
+def metrics_to_json(mode, summary):
+    """Форматирует сводку метрик в JSON."""
+    return json.dumps({'mode': mode, **summary}, ensure_ascii=False, indent=2)
+
+
+def metrics_to_prometheus(mode, summary):
+    """Форматирует сводку метрик в текстовый формат Prometheus."""
+    labels = f'mode="{mode}"'
+    lines = []
+    for name in ('pages', 'cache_hits', 'cache_misses', 'bytes_received',
+                 *COUNTERS):
+        lines.append(f'# TYPE parser_{name}_total counter')
+        lines.append(f'parser_{name}_total{{{labels}}} {summary[name]}')
+    for name in TIMINGS:
+        if name not in summary:
+            continue
+        lines.append(f'# TYPE parser_{name} summary')
+        for fraction in PERCENTILES:
+            value = summary[name][f'p{round(fraction * 100)}']
+            lines.append(
+                f'parser_{name}{{{labels},quantile="{fraction}"}} {value}')
+        lines.append(f'parser_{name}_sum{{{labels}}} {summary[name]["sum"]}')
+        lines.append(
+            f'parser_{name}_count{{{labels}}} {summary[name]["count"]}')
+    return '\n'.join(lines) + '\n'
@@ -1,11 +1,21 @@
 import csv
 import datetime as dt
+import gzip
+import io
+import json
 import logging
 
-from prettytable import PrettyTable
+from constants import (BASE_DIR, DATETIME_FORMAT, METRICS_DIR_NAME,
+                       METRICS_JSON, METRICS_PROMETHEUS, OUTPUT_CSV_GZIP,
+                       OUTPUT_CSV_ZSTD, OUTPUT_FILE, OUTPUT_NDJSON,
+                       OUTPUT_PARQUET, OUTPUT_PRETTY, RESULTS_DIR_NAME)
+from exceptions import MissingDependencyError
+from metrics import METRICS, metrics_to_json, metrics_to_prometheus
 
-from constants import (BASE_DIR, DATETIME_FORMAT, OUTPUT_FILE, OUTPUT_PRETTY,
-                       RESULTS_DIR_NAME)
+METRICS_FORMATS = {
+    METRICS_JSON: (metrics_to_json, 'json'),
+    METRICS_PROMETHEUS: (metrics_to_prometheus, 'prom'),
+}
 
 
 def control_output(results, cli_args):
@@ -16,40 +26,176 @@ def control_output(results, cli_args):
     output = cli_args.output
     if output == OUTPUT_PRETTY:
         pretty_output(results)
-    elif output == OUTPUT_FILE:
-        file_output(results, cli_args)
+    elif output in FILE_OUTPUTS:
+        FILE_OUTPUTS[output](results, cli_args)
     else:
         default_output(results)
 
 
 def default_output(results):
-    """Выводит результаты в стандартном формате."""
+    """Выводит результаты в стандартном формате по мере их получения."""
     for row in results:
-        print(*row)
+        print(*row, flush=True)
 
 
 def pretty_output(results):
-    """Выводит результаты в виде таблицы с использованием PrettyTable."""
+    """
+    Выводит результаты в виде таблицы с использованием PrettyTable.
+
+    Ширина столбцов зависит от всех строк, поэтому таблица выводится
+    после получения последней строки.
+    """
+    from prettytable import PrettyTable
+
+    rows = iter(results)
     table = PrettyTable()
-    table.field_names = results[0]
+    table.field_names = next(rows)
     table.align = 'l'
-    table.add_rows(results[1:])
+    table.add_rows(list(rows))
     print(table)
 
 
-def file_output(results, cli_args):
-    """Сохраняет результаты в файл CSV."""
+def results_file_path(cli_args, extension):
+    """Формирует путь к файлу результатов в директории results."""
     results_dir = BASE_DIR / RESULTS_DIR_NAME
     results_dir.mkdir(exist_ok=True)
     parser_mode = cli_args.mode
 
     now = dt.datetime.now()
     now_formatted = now.strftime(DATETIME_FORMAT)
-    file_name = f'{parser_mode}_{now_formatted}.csv'
-    file_path = results_dir / file_name
+    file_name = f'{parser_mode}_{now_formatted}.{extension}'
+    return results_dir / file_name
+
+
+def file_output(results, cli_args):
+    """Сохраняет результаты в файл CSV, записывая строки по мере получения."""
+    file_path = results_file_path(cli_args, 'csv')
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        writer = csv.writer(f, dialect='unix')
+        writer.writerows(results)
+
+    logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def ndjson_output(results, cli_args):
+    """
+    Сохраняет результаты в файл NDJSON: по JSON-объекту на строку,
+    с ключами из строки заголовка.
+    """
+    file_path = results_file_path(cli_args, 'ndjson')
+    rows = iter(results)
+    header = next(rows)
 
     with open(file_path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(dict(zip(header, row)), ensure_ascii=False))
+            f.write('\n')
+
+    logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def gzip_csv_output(results, cli_args):
+    """Сохраняет результаты в сжатый gzip файл CSV."""
+    file_path = results_file_path(cli_args, 'csv.gz')
+
+    with gzip.open(file_path, 'wt', encoding='utf-8', newline='') as f:
         writer = csv.writer(f, dialect='unix')
         writer.writerows(results)
 
     logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def zstd_csv_output(results, cli_args):
+    """Сохраняет результаты в сжатый zstd файл CSV."""
+    try:
+        import zstandard
+    except ImportError:
+        raise MissingDependencyError(
+            'Для вывода в csv-zst установите пакет zstandard')
+
+    file_path = results_file_path(cli_args, 'csv.zst')
+
+    with open(file_path, 'wb') as raw_file:
+        compressor = zstandard.ZstdCompressor()
+        with compressor.stream_writer(raw_file) as compressed, \
+                io.TextIOWrapper(compressed, encoding='utf-8',
+                                 newline='') as f:
+            writer = csv.writer(f, dialect='unix')
+            writer.writerows(results)
+
+    logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def parquet_column(pyarrow, values):
+    """
+    Собирает столбец Parquet из значений.
+
+    Тип столбца определяется по значениям. Если значения разных типов
+    (например, счётчики и доли в процентах в режиме cache-stats),
+    столбец сохраняется как строковый.
+    """
+    try:
+        return pyarrow.array(values)
+    except pyarrow.ArrowException:
+        return pyarrow.array(
+            [None if value is None else str(value) for value in values],
+            pyarrow.string())
+
+
+def parquet_output(results, cli_args):
+    """
+    Сохраняет результаты в колоночный файл Parquet.
+
+    Числовые столбцы сохраняются как числа, остальные и столбцы
+    со значениями разных типов — как строки.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise MissingDependencyError(
+            'Для вывода в parquet установите пакет pyarrow')
+
+    file_path = results_file_path(cli_args, 'parquet')
+    rows = iter(results)
+    header = next(rows)
+    columns = list(zip(*rows)) or [()] * len(header)
+    table = pyarrow.Table.from_arrays(
+        [parquet_column(pyarrow, values) for values in columns],
+        names=list(header))
+
+    pyarrow.parquet.write_table(table, file_path, compression='zstd')
+
+    logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+FILE_OUTPUTS = {
+    OUTPUT_FILE: file_output,
+    OUTPUT_NDJSON: ndjson_output,
+    OUTPUT_CSV_GZIP: gzip_csv_output,
+    OUTPUT_CSV_ZSTD: zstd_csv_output,
+    OUTPUT_PARQUET: parquet_output,
+}
+
+
+def metrics_output(cli_args):
+    """
+    Сохраняет метрики загрузки и разбора страниц в JSON-файл
+    или текстовый файл для Prometheus.
+    """
+    summary = METRICS.summary()
+    formatter, extension = METRICS_FORMATS[cli_args.metrics]
+    file_path = cli_args.metrics_path
+    if file_path is None:
+        metrics_dir = BASE_DIR / METRICS_DIR_NAME
+        metrics_dir.mkdir(exist_ok=True)
+        file_path = metrics_dir / f'{cli_args.mode}.{extension}'
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(formatter(cli_args.mode, summary))
+
+    logging.info(
+        f'Страниц: {summary["pages"]}, из кеша: {summary["cache_hits"]}, '
+        f'получено байт: {summary["bytes_received"]}')
+    logging.info(f'Файл с метриками был сохранён: {file_path}')
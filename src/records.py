@@ -0,0 +1,94 @@
+import sys
+from collections import Counter
+from operator import attrgetter
+from typing import NamedTuple, Optional
+
+
+def intern_text(value):
+    """
+    Возвращает единственный экземпляр строки с таким значением.
+
+    Статусы и типы PEP повторяются в тысячах записей; после интернирования
+    все записи ссылаются на одну строку. None возвращается как есть.
+    """
+    return None if value is None else sys.intern(str(value))
+
+
+class PepIndexRow(NamedTuple):
+    """Строка таблицы индекса PEP."""
+
+    table_status: Optional[str]
+    url: str
+    title: str
+
+    @classmethod
+    def make(cls, table_status, url, title):
+        """Создаёт строку индекса с интернированным статусом."""
+        return cls(intern_text(table_status), url, title)
+
+
+class PepCard(NamedTuple):
+    """Статус, тип и заголовок из карточки PEP."""
+
+    status: str
+    type: str
+    title: str
+
+    @classmethod
+    def make(cls, status, pep_type, title):
+        """Создаёт карточку с интернированными статусом и типом."""
+        return cls(intern_text(status), intern_text(pep_type), title)
+
+
+class PepRecord(NamedTuple):
+    """Запись о PEP в порядке столбцов базы store.UPSERT_PEP."""
+
+    url: str
+    number: Optional[int]
+    title: str
+    table_status: Optional[str]
+    status: str
+    type: str
+    mismatch: bool
+    checked_at: str
+
+
+class VersionEntry(NamedTuple):
+    """Строка результата режима latest-versions."""
+
+    HEADER = ('Ссылка', 'Версия', 'Статус')
+
+    link: str
+    version: str
+    status: str
+
+    @classmethod
+    def make(cls, link, version, status):
+        """Создаёт строку с интернированным статусом версии."""
+        return cls(link, version, intern_text(status))
+
+
+class WhatsNewArticle(NamedTuple):
+    """Строка результата режима whats-new."""
+
+    HEADER = ('Ссылка на статью', 'Заголовок', 'Редактор, автор')
+
+    link: str
+    title: str
+    editors: str
+
+
+def count_by(records, field):
+    """Считает записи по значению поля field."""
+    return Counter(map(attrgetter(field), records))
+
+
+def counter_rows(counter, total_label='Total'):
+    """
+    Преобразует счётчик в строки результата для outputs.
+
+    Строки идут в порядке первого появления значений, последняя
+    строка — итог.
+    """
+    yield from counter.items()
+    yield (total_label, sum(counter.values()))
@@ -0,0 +1,361 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from requests import RequestException
+
+from constants import (CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT,
+                       DEFAULT_WORKERS, FETCH_RETRIES, LATENCY_TOLERANCE,
+                       MAX_RETRY_AFTER, REQUEST_TIMEOUT, RETRY_BACKOFF,
+                       RETRY_BACKOFF_MAX, THROTTLE_BACKOFF, THROTTLE_RETRIES,
+                       THROTTLE_STATUSES)
+from exceptions import CircuitOpenError
+from metrics import METRICS
+
+# Вес нового замера в скользящем среднем задержки ответа
+LATENCY_SMOOTHING = 0.2
+
+
+class TokenBucket:
+    """
+    Ограничивает частоту запросов алгоритмом маркерной корзины.
+
+    Корзина вмещает burst маркеров и пополняется со скоростью rate
+    маркеров в секунду. Маркер резервируется сразу, поэтому потоки
+    получают доступ в порядке обращения.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Забирает маркер, при необходимости дожидаясь его появления."""
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+
+class AimdLimiter:
+    """
+    Ограничивает число одновременных запросов по схеме AIMD.
+
+    После успешного ответа предел растёт на 1/предел (примерно на единицу
+    за «раунд» запросов), а при перегрузке сервера — ответе из
+    THROTTLE_STATUSES или задержке выше обычной в LATENCY_TOLERANCE раз —
+    уменьшается вдвое, но не ниже единицы.
+    """
+
+    def __init__(self, max_limit):
+        self.max_limit = max_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.latency = None
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """Занимает место для запроса, дожидаясь, пока оно освободится."""
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    def release(self, latency=None, overloaded=False):
+        """
+        Освобождает место и пересчитывает предел.
+
+        latency — время ответа сервера в секундах; None, если ответ
+        получен не от сервера (например, из кеша).
+        """
+        with self.condition:
+            self.in_flight -= 1
+            if latency is not None and self.latency is not None:
+                overloaded = (overloaded
+                              or latency > self.latency * LATENCY_TOLERANCE)
+            if overloaded:
+                self.limit = max(1.0, self.limit / 2)
+            elif latency is not None:
+                self.limit = min(
+                    float(self.max_limit), self.limit + 1 / self.limit)
+            if latency is not None:
+                self.latency = latency if self.latency is None else (
+                    LATENCY_SMOOTHING * latency
+                    + (1 - LATENCY_SMOOTHING) * self.latency)
+            self.condition.notify_all()
+
+
+class CircuitBreaker:
+    """
+    Отключает запросы к хосту после серии сетевых ошибок.
+
+    После failure_threshold ошибок подряд цепь размыкается, и запросы
+    сразу завершаются CircuitOpenError. Через reset_timeout секунд
+    пропускается один пробный запрос: успех замыкает цепь, ошибка снова
+    размыкает её.
+    """
+
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def check(self, url):
+        """Выбрасывает CircuitOpenError, если запрос выполнять не нужно."""
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if (not self.probing and time.monotonic() - self.opened_at
+                    >= self.reset_timeout):
+                self.probing = True
+                return
+        raise CircuitOpenError(
+            f'Хост {self.name} недоступен, запрос {url} не выполнялся')
+
+    def success(self):
+        """Учитывает ответ сервера и замыкает цепь."""
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def failure(self):
+        """Учитывает сетевую ошибку и при необходимости размыкает цепь."""
+        with self.lock:
+            self.failures += 1
+            already_open = self.opened_at is not None
+            if not self.probing and (
+                    already_open or self.failures < self.failure_threshold):
+                return
+            self.opened_at = time.monotonic()
+            self.probing = False
+        logging.warning(
+            f'Хост {self.name} недоступен после {self.failures} ошибок '
+            f'подряд, запросы к нему отключены на {self.reset_timeout} с')
+
+
+class HostLimiter:
+    """Ограничения запросов к одному хосту."""
+
+    def __init__(self, name, rate, burst, max_concurrency,
+                 failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.concurrency = AimdLimiter(max_concurrency)
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def pause(self, seconds):
+        """Приостанавливает запросы к хосту на заданное время."""
+        with self.lock:
+            self.paused_until = max(
+                self.paused_until, time.monotonic() + seconds)
+
+    def wait(self):
+        """Дожидается окончания паузы и разрешения на запрос."""
+        while True:
+            with self.lock:
+                delay = self.paused_until - time.monotonic()
+            if delay <= 0:
+                break
+            time.sleep(delay)
+        if self.bucket is not None:
+            self.bucket.acquire()
+        self.concurrency.acquire()
+
+
+def retry_after_seconds(response):
+    """
+    Разбирает заголовок Retry-After: число секунд или HTTP-дату.
+
+    Возвращает None, если заголовка нет или его не удалось разобрать.
+    """
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = retry_at.timestamp() - time.time()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class FetchScheduler:
+    """
+    Общий планировщик исходящих запросов страниц.
+
+    Для каждого хоста действуют маркерная корзина с частотой rate
+    запросов в секунду (без ограничения при rate=None или 0) и AIMD-предел
+    одновременных запросов не выше max_concurrency. Частота не
+    подстраивается под сервер: rate — это верхняя граница, а AIMD
+    меняет только число одновременных запросов. Свежие ответы из кеша
+    сессии отдаются без ожидания и не расходуют маркеры. Ответы из
+    THROTTLE_STATUSES повторяются до throttle_retries раз после паузы
+    из заголовка Retry-After, которая действует на все запросы к хосту.
+    Сетевые ошибки повторяются до retries раз со случайной
+    экспоненциальной паузой, а после серии ошибок подряд запросы
+    к хосту отключает CircuitBreaker.
+    """
+
+    def __init__(self, rate=None, burst=1, max_concurrency=DEFAULT_WORKERS,
+                 **options):
+        self.configure(rate, burst, max_concurrency, **options)
+
+    def configure(self, rate=None, burst=1, max_concurrency=DEFAULT_WORKERS,
+                  throttle_retries=THROTTLE_RETRIES, retries=FETCH_RETRIES,
+                  retry_backoff=RETRY_BACKOFF, timeout=REQUEST_TIMEOUT,
+                  failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                  reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        """Задаёт ограничения и сбрасывает накопленное состояние хостов."""
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_concurrency = max_concurrency
+        self.throttle_retries = throttle_retries
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def host(self, url):
+        """Возвращает ограничения для хоста из URL."""
+        netloc = urlsplit(url).netloc
+        with self.lock:
+            if netloc not in self.hosts:
+                self.hosts[netloc] = HostLimiter(
+                    netloc, self.rate, self.burst, self.max_concurrency,
+                    self.failure_threshold, self.reset_timeout)
+            return self.hosts[netloc]
+
+    @staticmethod
+    def cached(session, url, **kwargs):
+        """
+        Возвращает свежий ответ из кеша сессии или None.
+
+        Ответ ищется запросом с only_if_cached, который не обращается
+        к сети. Для устаревших копий, которые нужно перезапросить,
+        и в режиме always_revalidate, где каждая страница проверяется
+        условным запросом, возвращается None.
+        """
+        settings = getattr(session, 'settings', None)
+        if (not hasattr(session, 'cache') or settings is None
+                or settings.disabled or settings.always_revalidate):
+            return None
+        response = session.get(url, only_if_cached=True, **kwargs)
+        # При промахе requests-cache возвращает ответ 504 без ключа кеша
+        if response.cache_key and not response.is_expired:
+            return response
+        response.close()
+        return None
+
+    @staticmethod
+    def send(host, session, url, **kwargs):
+        """
+        Отправляет запрос к серверу, заняв разрешение хоста.
+
+        Ожидание разрешения учитывается в метрике wait_seconds, сам
+        запрос — в fetch_seconds. По ответу пересчитывается предел
+        одновременных запросов.
+        """
+        with METRICS.timed('wait_seconds', url):
+            host.wait()
+        response = None
+        started = time.monotonic()
+        try:
+            with METRICS.timed('fetch_seconds', url):
+                response = session.get(url, **kwargs)
+            return response
+        finally:
+            from_cache = getattr(response, 'from_cache', False)
+            host.concurrency.release(
+                latency=(None if response is None or from_cache
+                         else time.monotonic() - started),
+                overloaded=(response is not None
+                            and response.status_code in THROTTLE_STATUSES)
+            )
+
+    def retry_pause(self, url, attempt, error):
+        """Выжидает случайную паузу перед повтором после сетевой ошибки."""
+        delay = random.uniform(
+            0, min(RETRY_BACKOFF_MAX, self.retry_backoff * 2 ** attempt))
+        logging.warning(
+            f'Ошибка при загрузке страницы {url}: {error}, '
+            f'повтор через {delay:.1f} с')
+        METRICS.record(url, retries=1)
+        with METRICS.timed('wait_seconds', url):
+            time.sleep(delay)
+
+    @staticmethod
+    def throttle_pause(host, response, url, attempt):
+        """Приостанавливает запросы к хосту по ответу из THROTTLE_STATUSES."""
+        delay = retry_after_seconds(response)
+        if delay is None:
+            delay = THROTTLE_BACKOFF * 2 ** attempt
+        logging.warning(
+            f'Сервер ответил {response.status_code} на запрос {url}, '
+            f'повтор через {delay:.1f} с')
+        response.close()
+        host.pause(delay)
+
+    def get(self, session, url, **kwargs):
+        """
+        Выполняет GET-запрос с учётом ограничений хоста.
+
+        Свежий ответ из кеша возвращается сразу, ограничения хоста
+        действуют только на запросы к серверу. Исключение
+        RequestException выбрасывается, когда исчерпаны повторы,
+        CircuitOpenError — когда запросы к хосту отключены.
+        """
+        host = self.host(url)
+        kwargs.setdefault('timeout', self.timeout)
+        with METRICS.timed('fetch_seconds', url):
+            response = self.cached(session, url, **kwargs)
+        if response is not None:
+            return response
+        failures = throttled = 0
+        while True:
+            host.breaker.check(url)
+            try:
+                response = self.send(host, session, url, **kwargs)
+            except RequestException as e:
+                host.breaker.failure()
+                if failures == self.retries:
+                    raise
+                self.retry_pause(url, failures, e)
+                failures += 1
+                continue
+            host.breaker.success()
+            if (response.status_code not in THROTTLE_STATUSES
+                    or throttled == self.throttle_retries):
+                return response
+            self.throttle_pause(host, response, url, throttled)
+            throttled += 1
+
+
+SCHEDULER = FetchScheduler()
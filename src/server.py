@@ -0,0 +1,200 @@
+import datetime as dt
+import json
+import logging
+import os
+import socketserver
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from constants import SERVE_REFRESH_INTERVAL
+
+
+class ResultIndex:
+    """
+    Индекс результатов режимов парсера в памяти.
+
+    sources сопоставляет имени режима функцию без аргументов, которая
+    возвращает строки результата, первая из них — заголовок. Ответы
+    сериализуются в JSON при обновлении индекса, поэтому запрос к серверу
+    отдаёт готовые байты без разбора и преобразования данных.
+    """
+
+    def __init__(self, sources):
+        self.sources = sources
+        self.lock = threading.Lock()
+        self.bodies = {}
+        self.refreshed = {}
+
+    def refresh(self):
+        """
+        Заново получает результаты всех режимов.
+
+        Если режим завершился ошибкой, в индексе остаётся его предыдущий
+        результат. Возвращает количество обновлённых режимов.
+        """
+        refreshed = 0
+        for mode, source in self.sources.items():
+            try:
+                rows = list(source())
+            except Exception:
+                logging.exception(f'Не удалось обновить результаты {mode}')
+                continue
+            refreshed_at = dt.datetime.now().isoformat(timespec='seconds')
+            body = json.dumps({
+                'mode': mode,
+                'refreshed_at': refreshed_at,
+                'header': rows[0] if rows else [],
+                'rows': rows[1:],
+            }, ensure_ascii=False, default=str).encode('utf-8')
+            with self.lock:
+                self.bodies[mode] = body
+                self.refreshed[mode] = refreshed_at
+            refreshed += 1
+        logging.info(f'Индекс результатов обновлён: режимов {refreshed} '
+                     f'из {len(self.sources)}')
+        return refreshed
+
+    def get(self, mode):
+        """Возвращает JSON с результатом режима или None, если его нет."""
+        with self.lock:
+            return self.bodies.get(mode)
+
+    def summary(self):
+        """Возвращает JSON со временем обновления каждого режима."""
+        with self.lock:
+            refreshed = dict(self.refreshed)
+        return json.dumps({
+            mode: refreshed.get(mode) for mode in self.sources
+        }).encode('utf-8')
+
+
+class IndexRefresher(threading.Thread):
+    """
+    Поток, который обновляет индекс сразу и затем раз в interval секунд.
+
+    После каждого обновления вызывается after_refresh, если он задан,
+    например для очистки кеша страниц.
+    """
+
+    def __init__(self, index, interval, after_refresh=None):
+        super().__init__(name='index-refresher', daemon=True)
+        self.index = index
+        self.interval = interval
+        self.after_refresh = after_refresh
+        self.stopped = threading.Event()
+
+    def run(self):
+        while True:
+            self.index.refresh()
+            if self.after_refresh is not None:
+                try:
+                    self.after_refresh()
+                except Exception:
+                    logging.exception('Ошибка после обновления индекса')
+            if self.stopped.wait(self.interval):
+                return
+
+    def stop(self):
+        """Останавливает обновление, дождавшись текущего обхода режимов."""
+        self.stopped.set()
+        self.join()
+
+
+class IndexRequestHandler(BaseHTTPRequestHandler):
+    """
+    Отвечает на запросы к индексу результатов.
+
+    GET / возвращает время обновления режимов, GET /<режим> — результат
+    режима. Соединения поддерживаются между запросами (HTTP/1.1).
+    """
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        index = self.server.index
+        mode = urlsplit(self.path).path.strip('/')
+        if not mode:
+            self.send_body(HTTPStatus.OK, index.summary())
+            return
+        body = index.get(mode)
+        if body is not None:
+            self.send_body(HTTPStatus.OK, body)
+        elif mode in index.sources:
+            self.send_body(HTTPStatus.SERVICE_UNAVAILABLE, json.dumps(
+                {'error': f'Результаты {mode} ещё не получены'},
+                ensure_ascii=False).encode('utf-8'))
+        else:
+            self.send_body(HTTPStatus.NOT_FOUND, json.dumps(
+                {'error': f'Неизвестный режим {mode}'},
+                ensure_ascii=False).encode('utf-8'))
+
+    def send_body(self, status, body):
+        """Отправляет ответ с телом в JSON."""
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+
+class UnixIndexRequestHandler(IndexRequestHandler):
+    """Обработчик запросов к индексу через Unix-сокет."""
+
+    disable_nagle_algorithm = False
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn,
+                     socketserver.UnixStreamServer):
+    """HTTP-сервер на Unix-сокете, каждый клиент — в своём потоке."""
+
+    daemon_threads = True
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def make_server(index, host, port, socket_path=None):
+    """
+    Создаёт HTTP-сервер индекса результатов.
+
+    С socket_path сервер слушает Unix-сокет по этому пути, иначе — TCP
+    host:port. Оставшийся от прошлого запуска файл сокета удаляется.
+    """
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixHTTPServer(str(socket_path), UnixIndexRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), IndexRequestHandler)
+    server.index = index
+    return server
+
+
+def run_server(index, host, port, socket_path=None,
+               refresh_interval=SERVE_REFRESH_INTERVAL, after_refresh=None):
+    """
+    Обслуживает запросы к индексу, пока процесс не прервут.
+
+    Индекс обновляется в фоновом потоке сразу после запуска и затем раз
+    в refresh_interval секунд, после каждого обновления вызывается
+    after_refresh.
+    """
+    server = make_server(index, host, port, socket_path)
+    refresher = IndexRefresher(index, refresh_interval, after_refresh)
+    refresher.start()
+    logging.info(f'Сервер результатов слушает {server.server_address}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info('Сервер результатов остановлен')
+    finally:
+        server.server_close()
+        refresher.stop()
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import zlib
+from collections import Counter
+
+from exceptions import ShardMergeError
+from state import save_state
+
+SHARD_FILE_PATTERN = 'pep_*-of-*.json'
+
+
+def shard_number(url, count):
+    """
+    Возвращает номер шарда от 1 до count, которому принадлежит PEP.
+
+    Номер зависит только от URL карточки, поэтому совпадает во всех
+    процессах и на всех машинах, а повторы PEP в таблицах индекса
+    попадают в один шард.
+    """
+    return zlib.crc32(url.encode('utf-8')) % count + 1
+
+
+def select_shard(pep_rows, shard):
+    """Оставляет строки индекса PEP, которые относятся к шарду i/N."""
+    number, count = shard
+    return [row for row in pep_rows if shard_number(row.url, count) == number]
+
+
+def shard_file_name(shard):
+    """Имя файла с результатом шарда i/N."""
+    number, count = shard
+    return f'pep_{number}-of-{count}.json'
+
+
+def index_digest(pep_rows):
+    """Вычисляет отпечаток всего индекса PEP для сверки шардов."""
+    digest = hashlib.sha1()
+    for row in pep_rows:
+        digest.update('\x1f'.join(
+            (row.table_status or '', row.url, row.title)).encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+def shard_summary(shard, pep_rows, records, mismatches):
+    """
+    Собирает результат шарда в виде, пригодном для слияния.
+
+    pep_rows — весь индекс PEP, records — записи шарда, mismatches — пары
+    (URL, сообщение о несовпадении статусов). Для каждого статуса
+    сохраняется количество и позиция первой строки индекса с ним, а для
+    сообщений — позиция строки: по ним merge восстанавливает порядок,
+    в котором pep выводит сводку без шардов.
+    """
+    positions = {}
+    for position, row in enumerate(pep_rows):
+        positions.setdefault(row.url, position)
+    statuses = {}
+    for record in records:
+        entry = statuses.setdefault(
+            record.status, [0, positions[record.url]])
+        entry[0] += 1
+    return {
+        'shard': list(shard),
+        'index_digest': index_digest(pep_rows),
+        'statuses': [
+            [status, count, position]
+            for status, (count, position) in statuses.items()
+        ],
+        'mismatches': [
+            [positions[url], message] for url, message in mismatches
+        ],
+    }
+
+
+def save_shard(shard_dir, shard, summary):
+    """Сохраняет результат шарда в директорию shard_dir."""
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    path = shard_dir / shard_file_name(shard)
+    save_state(path, summary)
+    return path
+
+
+def load_shards(shard_dir):
+    """Загружает результаты всех шардов из директории shard_dir."""
+    summaries = []
+    for path in sorted(shard_dir.glob(SHARD_FILE_PATTERN)):
+        with open(path, encoding='utf-8') as file:
+            summaries.append(json.load(file))
+    if not summaries:
+        raise ShardMergeError(f'В {shard_dir} нет результатов шардов')
+    return summaries
+
+
+def check_shards(summaries):
+    """
+    Проверяет, что результаты шардов складываются в полный прогон.
+
+    Все шарды должны быть получены по одному и тому же индексу PEP
+    и с одним количеством шардов N, и каждый номер от 1 до N должен
+    встречаться ровно один раз.
+    """
+    counts = {summary['shard'][1] for summary in summaries}
+    if len(counts) != 1:
+        raise ShardMergeError(
+            f'Шарды из прогонов с разным количеством шардов: {counts}')
+    if len({summary['index_digest'] for summary in summaries}) != 1:
+        raise ShardMergeError(
+            'Шарды получены по разным версиям индекса PEP')
+    count = counts.pop()
+    numbers = sorted(summary['shard'][0] for summary in summaries)
+    if numbers != list(range(1, count + 1)):
+        raise ShardMergeError(
+            f'Ожидались шарды 1..{count}, получены: {numbers}')
+
+
+def merge_shards(summaries):
+    """
+    Сливает результаты шардов.
+
+    Возвращает счётчик статусов в порядке первого появления в индексе
+    и список сообщений о несовпадении статусов в порядке строк индекса.
+    """
+    check_shards(summaries)
+    counts = Counter()
+    first_positions = {}
+    mismatches = []
+    for summary in summaries:
+        for status, count, position in summary['statuses']:
+            counts[status] += count
+            first_positions[status] = min(
+                position, first_positions.get(status, position))
+        mismatches.extend(summary['mismatches'])
+    statuses = Counter({
+        status: counts[status]
+        for status in sorted(counts, key=first_positions.get)
+    })
+    return statuses, [message for _, message in sorted(mismatches)]
@@ -0,0 +1,158 @@
+import json
+import mmap
+import os
+import struct
+from urllib.parse import urldefrag
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from exceptions import SnapshotError
+
+# Формат файла снимка: сигнатура, тела страниц подряд, оглавление
+# в JSON и концевик со смещением и длиной оглавления. Оглавление
+# сопоставляет URL смещение, длину тела, код ответа и тип содержимого.
+SNAPSHOT_MAGIC = b'PYSNAP01'
+FOOTER = struct.Struct('<QQ8s')
+
+
+def snapshot_key(url):
+    """Приводит URL к ключу оглавления: якорь на ответ не влияет."""
+    return urldefrag(url)[0]
+
+
+class SnapshotWriter:
+    """
+    Записывает страницы в файл снимка по мере загрузки.
+
+    Данные пишутся во временный файл, который при выходе из контекста
+    атомарно заменяет path. Если в блоке возникло исключение, временный
+    файл удаляется.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = path.with_name(path.name + '.tmp')
+        self.index = {}
+        self.file = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.temp_path, 'wb')
+        self.file.write(SNAPSHOT_MAGIC)
+        return self
+
+    def add(self, url, response):
+        """Добавляет в снимок тело и код ответа для URL."""
+        body = response.content
+        self.index[snapshot_key(url)] = (
+            self.file.tell(), len(body), response.status_code,
+            response.headers.get('Content-Type', '')
+        )
+        self.file.write(body)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.file.close()
+            self.temp_path.unlink()
+            return
+        index = json.dumps(self.index, ensure_ascii=False).encode('utf-8')
+        index_offset = self.file.tell()
+        self.file.write(index)
+        self.file.write(FOOTER.pack(index_offset, len(index), SNAPSHOT_MAGIC))
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+
+class SnapshotArchive:
+    """
+    Снимок страниц, открытый через отображение файла в память.
+
+    Оглавление читается один раз при открытии, тела страниц берутся
+    срезами отображения без чтения файла целиком.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if (len(self.mmap) < len(SNAPSHOT_MAGIC) + FOOTER.size
+                or self.mmap[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC):
+            self.mmap.close()
+            raise SnapshotError(f'Файл {path} не является снимком страниц')
+        index_offset, index_length, magic = FOOTER.unpack(
+            self.mmap[-FOOTER.size:])
+        if magic != SNAPSHOT_MAGIC:
+            self.mmap.close()
+            raise SnapshotError(f'Снимок {path} записан не полностью')
+        self.index = json.loads(
+            self.mmap[index_offset:index_offset + index_length])
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, url):
+        return snapshot_key(url) in self.index
+
+    def get(self, url):
+        """
+        Возвращает код ответа, тип содержимого и тело страницы.
+
+        Если страницы нет в снимке, возвращает None.
+        """
+        entry = self.index.get(snapshot_key(url))
+        if entry is None:
+            return None
+        offset, length, status_code, content_type = entry
+        return status_code, content_type, self.mmap[offset:offset + length]
+
+    def close(self):
+        """Закрывает отображение файла."""
+        self.mmap.close()
+
+
+class SnapshotAdapter(BaseAdapter):
+    """
+    Транспортный адаптер requests, который отвечает страницами снимка.
+
+    Запрос к странице, которой нет в снимке, завершается ConnectionError,
+    как запрос к недоступному серверу.
+    """
+
+    def __init__(self, archive):
+        super().__init__()
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        """Возвращает ответ со страницей снимка."""
+        entry = self.archive.get(request.url)
+        if entry is None:
+            raise requests.ConnectionError(
+                f'Страницы {request.url} нет в снимке', request=request)
+        status_code, content_type, body = entry
+
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict({
+            'Content-Type': content_type,
+            'Content-Length': str(len(body)),
+        })
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = b'' if request.method == 'HEAD' else body
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        """Закрывает снимок."""
+        self.archive.close()
+
+
+def replay_session(path):
+    """Создаёт сессию, которая отвечает страницами из снимка без сети."""
+    session = requests.Session()
+    adapter = SnapshotAdapter(SnapshotArchive(path))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
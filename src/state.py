@@ -0,0 +1,30 @@
+import json
+import os
+
+
+def load_state(path):
+    """
+    Загружает сохранённое состояние из JSON-файла.
+
+    Если файла нет или он повреждён, возвращает пустой словарь:
+    в этом случае работа начинается с чистого листа.
+    """
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(path, state):
+    """
+    Атомарно сохраняет состояние в JSON-файл.
+
+    Данные пишутся во временный файл, который затем заменяет основной,
+    поэтому прерванная запись не портит предыдущее состояние.
+    """
+    path.parent.mkdir(exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(state, file, ensure_ascii=False)
+    os.replace(temp_path, path)
@@ -0,0 +1,111 @@
+import sqlite3
+from itertools import islice
+
+from constants import STORE_BATCH_SIZE
+
+PEP_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS peps (
+    url TEXT PRIMARY KEY,
+    number INTEGER,
+    title TEXT NOT NULL,
+    table_status TEXT,
+    status TEXT NOT NULL,
+    type TEXT NOT NULL,
+    mismatch INTEGER NOT NULL,
+    checked_at TEXT NOT NULL,
+    mismatch_since TEXT
+);
+CREATE INDEX IF NOT EXISTS peps_status_type ON peps (status, type);
+CREATE INDEX IF NOT EXISTS peps_mismatch_since ON peps (mismatch_since);
+'''
+
+UPSERT_PEP = '''
+INSERT INTO peps (url, number, title, table_status, status, type,
+                  mismatch, checked_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET
+    number = excluded.number,
+    title = excluded.title,
+    table_status = excluded.table_status,
+    status = excluded.status,
+    type = excluded.type,
+    mismatch = excluded.mismatch,
+    checked_at = excluded.checked_at,
+    mismatch_since = CASE WHEN excluded.mismatch THEN peps.mismatch_since END
+'''
+
+# Время первого обнаружения несовпадения — время проверки, в которой
+# оно появилось; пока несовпадение сохраняется, время не меняется
+MARK_NEW_MISMATCHES = '''
+UPDATE peps SET mismatch_since = checked_at
+WHERE mismatch = 1 AND mismatch_since IS NULL
+'''
+
+PEP_COLUMNS = ('number', 'status', 'type', 'title', 'url')
+
+
+def open_store(path):
+    """
+    Открывает базу SQLite с записями PEP и создаёт схему.
+
+    База работает в режиме WAL: запись не блокирует чтение, а фиксация
+    транзакции не требует синхронизации всего файла.
+    """
+    path.parent.mkdir(exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(PEP_SCHEMA)
+    return connection
+
+
+def save_pep_records(connection, records, batch_size=STORE_BATCH_SIZE):
+    """
+    Сохраняет записи PEP пачками по batch_size в одной транзакции.
+
+    records — записи records.PepRecord или кортежи в порядке столбцов
+    UPSERT_PEP. Запись с уже известным URL заменяет прежнюю, но время
+    первого обнаружения несовпадения статусов сохраняется, пока
+    несовпадение не исчезнет. Возвращает количество записей.
+    """
+    records = iter(records)
+    saved = 0
+    with connection:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                connection.execute(MARK_NEW_MISMATCHES)
+                return saved
+            connection.executemany(UPSERT_PEP, batch)
+            saved += len(batch)
+
+
+def query_peps(connection, status=None, pep_type=None, mismatches=False,
+               since=None):
+    """
+    Выбирает записи PEP по статусу, типу и несовпадению статусов.
+
+    since — нижняя граница времени первого обнаружения несовпадения
+    статусов в формате ISO 8601: с ним выбираются только PEP, статусы
+    которых перестали совпадать начиная с этого момента. Записи
+    возвращаются по возрастанию номера PEP кортежами в порядке
+    PEP_COLUMNS.
+    """
+    conditions = []
+    params = []
+    if status is not None:
+        conditions.append('status = ?')
+        params.append(status)
+    if pep_type is not None:
+        conditions.append('type = ?')
+        params.append(pep_type)
+    if mismatches:
+        conditions.append('mismatch = 1')
+    if since is not None:
+        conditions.append('mismatch_since >= ?')
+        params.append(since)
+
+    sql = f'SELECT {", ".join(PEP_COLUMNS)} FROM peps'
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    return connection.execute(sql + ' ORDER BY number, url', params)
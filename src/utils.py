@@ -1,35 +1,112 @@
 import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial, wraps
 
-from requests import RequestException
-from bs4 import BeautifulSoup
+from constants import IN_FLIGHT_PER_WORKER
 
-from exceptions import PageLoadError, ParserFindTagException
+from exceptions import (CircuitOpenError, PageLoadError,
+                        ParserFindTagException)
+from metrics import METRICS
 
 
 def get_response(session, url, encoding='utf-8'):
-    """Получает ответ от указанного URL с заданной кодировкой."""
+    """
+    Получает ответ от указанного URL с заданной кодировкой.
+
+    Запрос проходит через общий планировщик SCHEDULER, который ограничивает
+    частоту и число одновременных запросов к хосту, повторяет запрос после
+    сетевых ошибок и отключает запросы к недоступному хосту.
+    """
+    # Стек requests загружается при первом запросе, а не при запуске
+    from requests import RequestException
+    from scheduler import SCHEDULER
+
     try:
-        response = session.get(url)
-        response.encoding = encoding
-        return response
+        response = SCHEDULER.get(session, url)
+    except CircuitOpenError:
+        METRICS.record(url, failures=1)
+        raise
     except RequestException as e:
+        METRICS.record(url, failures=1)
         raise PageLoadError(f"Ошибка при загрузке страницы {url}: {e}")
+    response.encoding = encoding
+    from_cache = getattr(response, 'from_cache', False)
+    # В bytes_received попадают только байты, полученные по сети
+    METRICS.record(url, from_cache=from_cache,
+                   bytes=0 if from_cache else len(response.content))
+    return response
+
+
+def make_soup(html, parser='lxml', parse_only=None):
+    """
+    Строит дерево BeautifulSoup из текста HTML-страницы.
+
+    Если передан parse_only (SoupStrainer), в дерево попадают только
+    подходящие под него теги вместе с их содержимым.
+    """
+    from bs4 import BeautifulSoup
+
+    with METRICS.timed('parse_seconds'):
+        return BeautifulSoup(html, parser, parse_only=parse_only)
 
 
-def fetch_soup(session, url, encoding='utf-8', parser='lxml'):
+@contextmanager
+def parsed_soup(html, parser='lxml', parse_only=None):
+    """
+    Строит дерево BeautifulSoup на время блока with.
+
+    На выходе из блока дерево разбирается методом decompose. Узлы
+    BeautifulSoup ссылаются друг на друга, и без этого память дерева
+    освобождается только сборщиком циклического мусора, когда деревьев
+    уже накопилось много. Данные из дерева нужно скопировать в строки
+    до выхода из блока.
+    """
+    soup = make_soup(html, parser, parse_only)
+    try:
+        yield soup
+    finally:
+        # decompose корня не обходит его потомков, поэтому теги верхнего
+        # уровня разбираются по отдельности
+        for tag in soup.find_all(recursive=False):
+            tag.decompose()
+        soup.decompose()
+
+
+def fetch_soup(session, url, encoding='utf-8', parser='lxml',
+               parse_only=None):
     """Получает и парсит HTML-страницу по заданному URL."""
     response = get_response(session, url, encoding)
 
-    return BeautifulSoup(response.text, parser)
+    return make_soup(response.text, parser, parse_only)
+
+
+def make_tree(html):
+    """Строит дерево lxml из текста HTML-страницы."""
+    from lxml import etree, html as lxml_html
+
+    try:
+        with METRICS.timed('parse_seconds'):
+            return lxml_html.document_fromstring(html)
+    except etree.ParserError:
+        # Пустой документ: поиск тегов в нём завершится
+        # ParserFindTagException, как и для BeautifulSoup
+        return lxml_html.document_fromstring('<html></html>')
+
+
+def raise_tag_not_found(tag, attrs=None):
+    """Логирует и выбрасывает ошибку об отсутствии тега."""
+    error_msg = f'Не найден тег {tag} {attrs}'
+    logging.error(error_msg, stack_info=True)
+    raise ParserFindTagException(error_msg)
 
 
 def find_tag(soup, tag, attrs=None):
     """Находит первый тег в soup с заданными атрибутами."""
     searched_tag = soup.find(tag, attrs=(attrs or {}))
     if searched_tag is None:
-        error_msg = f'Не найден тег {tag} {attrs}'
-        logging.error(error_msg, stack_info=True)
-        raise ParserFindTagException(error_msg)
+        raise_tag_not_found(tag, attrs)
     return searched_tag
 
 
@@ -37,7 +114,125 @@ def find_all_tag(soup, tag, attrs=None):
     """ Находит все теги в soup с заданными атрибутами."""
     searched_tag = soup.find_all(tag, attrs=(attrs or {}))
     if searched_tag is None:
-        error_msg = f'Не найден тег {tag} {attrs}'
-        logging.error(error_msg, stack_info=True)
-        raise ParserFindTagException(error_msg)
+        raise_tag_not_found(tag, attrs)
     return searched_tag
+
+
+def find_node(tree, xpath, tag, attrs=None):
+    """
+    Находит первый узел дерева lxml по предкомпилированному XPath.
+
+    Аргументы tag и attrs описывают искомый тег в сообщении об ошибке,
+    как в find_tag.
+    """
+    nodes = xpath(tree)
+    if not nodes:
+        raise_tag_not_found(tag, attrs)
+    return nodes[0]
+
+
+def bounded_results(submitted, window):
+    """
+    Возвращает результаты заданий в порядке их отправки.
+
+    submitted — ленивая последовательность объектов Future или готовых
+    результатов. Следующее задание берётся из неё, только когда
+    незабранных результатов меньше window, поэтому одновременно в работе
+    и в ожидании находится не больше window страниц.
+    """
+    pending = deque()
+    for item in submitted:
+        pending.append(item)
+        if len(pending) >= window:
+            yield result_of(pending.popleft())
+    while pending:
+        yield result_of(pending.popleft())
+
+
+def result_of(item):
+    """Дожидается результата Future; готовый результат возвращает как есть."""
+    return item.result() if isinstance(item, Future) else item
+
+
+def map_concurrently(func, items, workers=1):
+    """
+    Применяет функцию к элементам в пуле потоков.
+
+    Результаты возвращаются в исходном порядке элементов. В работе
+    находится не больше IN_FLIGHT_PER_WORKER заданий на поток: если
+    результаты забирают медленнее, чем они готовы, новые задания
+    не отправляются. При workers=1 элементы обрабатываются
+    последовательно в текущем потоке.
+    """
+    if workers <= 1:
+        yield from map(func, items)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from bounded_results(
+            (executor.submit(func, item) for item in items),
+            IN_FLIGHT_PER_WORKER * workers)
+
+
+def fetch_page(session, url):
+    """
+    Загружает текст страницы.
+
+    При ошибке загрузки возвращает объект исключения PageLoadError,
+    чтобы сбой одной страницы не прерывал параллельную обработку.
+    """
+    try:
+        return get_response(session, url).text
+    except PageLoadError as e:
+        return e
+
+
+def fetch_and_extract(session, extract, url):
+    """Загружает страницу и извлекает из неё данные функцией extract."""
+    page = fetch_page(session, url)
+    if isinstance(page, PageLoadError):
+        return page
+    with METRICS.page(url):
+        return extract(page)
+
+
+def extract_pages(session, urls, extract, workers=1, parse_workers=0):
+    """
+    Загружает страницы и извлекает из них данные функцией extract.
+
+    Загрузка выполняется в пуле из workers потоков. При parse_workers > 0
+    тексты страниц передаются в пул процессов, и разбор HTML идёт
+    параллельно загрузке; функция extract должна быть объявлена на уровне
+    модуля, а время разбора в дочерних процессах в метрики не попадает.
+    Тексты страниц, ожидающих разбора, не накапливаются: их не больше
+    IN_FLIGHT_PER_WORKER на процесс. Результаты возвращаются в порядке
+    urls, ошибки загрузки — объектами PageLoadError.
+    """
+    if not parse_workers:
+        yield from map_concurrently(
+            partial(fetch_and_extract, session, extract), urls, workers)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+        yield from bounded_results(
+            (page if isinstance(page, PageLoadError)
+             else executor.submit(extract, page)
+             for page in map_concurrently(
+                 partial(fetch_page, session), urls, workers)),
+            IN_FLIGHT_PER_WORKER * parse_workers)
+
+
+def streamable(mode_function):
+    """
+    Декоратор для функций режимов, написанных как генераторы строк.
+
+    По умолчанию функция возвращает список строк результата. С аргументом
+    stream=True возвращается сам генератор, и строки выводятся по мере
+    получения.
+    """
+    @wraps(mode_function)
+    def wrapper(*args, stream=False, **kwargs):
+        rows = mode_function(*args, **kwargs)
+        return rows if stream else list(rows)
+    return wrapper
@@ -31,6 +31,20 @@ def pytest_make_parametrize_id(config, val):
     return repr(val)
 
 
+@pytest.fixture(autouse=True)
+def fetch_scheduler():
+    """
+    Сбрасывает общий планировщик запросов перед каждым тестом.
+
+    Иначе сбои хоста в одном тесте отключали бы запросы к нему в других.
+    Повторы после сетевых ошибок идут без пауз.
+    """
+    import scheduler
+    scheduler.SCHEDULER.configure(retry_backoff=0)
+    yield scheduler.SCHEDULER
+    scheduler.SCHEDULER.configure()
+
+
 @pytest.fixture(scope='function')
 def tempfile_session() -> CachedSession:
     """Get a CachedSession using a temporary SQLite db"""
@@ -110,3 +124,55 @@ def records():
         result = results[mode]
         return converting(result)
     return _records
+
+
+# Количество PEP в индексе для pep_mocker: в разобранные строки индекса
+# попадают PEP всех видов из site_pages.PEP_KINDS, в том числе PEP
+# с несовпадающими статусами
+PEP_COUNT = 22
+
+
+def site_part_mocker(url_prefix, pep_count=PEP_COUNT):
+    """Регистрирует страницы site_pages, URL которых начинается с префикса."""
+    from tests.fixture_data.site_pages import build_site
+    mock = requests_mock.Mocker()
+    for url, html in build_site(pep_count).items():
+        if url.startswith(url_prefix):
+            mock.get(url, text=html)
+    return mock
+
+
+@pytest.fixture
+def pep_mocker():
+    """Отдаёт индекс и карточки PEP из site_pages без обращения к сети."""
+    from tests.fixture_data.site_pages import MAIN_PEP_URL
+    with site_part_mocker(MAIN_PEP_URL) as mock:
+        yield mock
+
+
+@pytest.fixture
+def whats_new_mocker():
+    """Отдаёт страницы whats-new из site_pages без обращения к сети."""
+    with site_part_mocker(MAIN_DOC_URL + 'whatsnew/') as mock:
+        yield mock
+
+
+@pytest.fixture
+def site_mocker():
+    """Отдаёт записанные страницы документации и PEP без обращения к сети."""
+    from tests.fixture_data.site_pages import archive_urls, build_site
+    with requests_mock.Mocker() as mock:
+        for url, html in build_site().items():
+            mock.get(url, text=html)
+        for url in archive_urls():
+            mock.head(url, headers={'Content-Length': '22'})
+            mock.get(url, content=b'PK\x05\x06' + b'\x00' * 18)
+        yield mock
+
+
+@pytest.fixture
+def stand_in_server():
+    """Локальный сервер, который отвечает с задержками и кодом 429."""
+    from tests.fixture_data.local_server import StandInServer
+    with StandInServer() as server:
+        yield server
@@ -0,0 +1,82 @@
+"""
+Локальный HTTP-сервер, который имитирует перегруженный сайт.
+
+Пути запросов задают поведение ответа:
+
+- /throttle/<имя>?count=N&retry_after=S — первые N запросов к пути
+  получают 429 с заголовком Retry-After: S, остальные — 200;
+- /drop/<имя>?count=N — первые N запросов к пути обрываются
+  без ответа;
+- /slow?delay=S — ответ 200 с задержкой S секунд;
+- любой другой путь — ответ 200.
+
+Сервер запоминает время каждого запроса и наибольшее число запросов,
+обрабатывавшихся одновременно.
+"""
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with server.lock:
+            server.hits[url.path] += 1
+            hit = server.hits[url.path]
+            server.request_times.append(time.monotonic())
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(float(query.get('delay', 0)))
+            if (url.path.startswith('/drop/')
+                    and hit <= int(query.get('count', 1))):
+                self.close_connection = True
+                return
+            if (url.path.startswith('/throttle/')
+                    and hit <= int(query.get('count', 1))):
+                self.send_response(429)
+                self.send_header('Retry-After', query.get('retry_after', '0'))
+            else:
+                self.send_response(200)
+            body = b'<html><body>ok</body></html>'
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.lock = threading.Lock()
+        self.hits = Counter()
+        self.request_times = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
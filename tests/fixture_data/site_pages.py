@@ -0,0 +1,100 @@
+from pathlib import Path
+
+PAGES_DIR = Path(__file__).parent / 'pages'
+
+MAIN_DOC_URL = 'https://docs.python.org/3/'
+MAIN_PEP_URL = 'https://peps.python.org/'
+
+WHATS_NEW_VERSIONS = ['3.13', '3.12', '3.11', '3.10', '2.0', 'changelog']
+ARCHIVE_NAMES = [
+    'python-3.13-docs-pdf-letter.zip',
+    'python-3.13-docs-pdf-a4.zip',
+    'python-3.13-docs-html.zip',
+    'python-3.13-docs-text.zip',
+    'python-3.13-docs.epub',
+]
+
+# (сокращение в индексе, статус в карточке, тип, расшифровка статуса)
+PEP_KINDS = [
+    ('PA', 'Active', 'Process', 'Process, Active'),
+    ('SF', 'Final', 'Standards Track', 'Standards Track, Final'),
+    ('IF', 'Final', 'Informational', 'Informational, Final'),
+    ('SR', 'Rejected', 'Standards Track', 'Standards Track, Rejected'),
+    ('SW', 'Withdrawn', 'Standards Track', 'Standards Track, Withdrawn'),
+    ('SD', 'Deferred', 'Standards Track', 'Standards Track, Deferred'),
+    ('SS', 'Superseded', 'Standards Track', 'Standards Track, Superseded'),
+    ('SA', 'Accepted', 'Standards Track', 'Standards Track, Accepted'),
+    ('S', 'Draft', 'Standards Track', 'Standards Track, Draft'),
+    ('SP', 'Provisional', 'Standards Track', 'Standards Track, Provisional'),
+    # Расхождение: в индексе Final, в карточке Active
+    ('IF', 'Active', 'Informational', 'Informational, Final'),
+]
+
+
+def load_page(name):
+    return (PAGES_DIR / name).read_text(encoding='utf-8')
+
+
+def pep_numbers(pep_count):
+    return list(range(1, pep_count + 1))
+
+
+def pep_kind(number):
+    return PEP_KINDS[number % len(PEP_KINDS)]
+
+
+def pep_url(number):
+    return f'{MAIN_PEP_URL}pep-{number:04d}/'
+
+
+def pep_index_html(pep_count):
+    row_template = load_page('pep_index_row.html')
+    rows = []
+    for position, number in enumerate(pep_numbers(pep_count)):
+        table_status, _, _, status_title = pep_kind(number)
+        rows.append(row_template.format(
+            row_class='row-even' if position % 2 == 0 else 'row-odd',
+            status_title=status_title,
+            table_status=table_status,
+            number=number,
+            title=f'Proposal number {number}',
+        ))
+    # Как и на настоящем сайте, часть PEP повторяется в таблицах категорий
+    return load_page('pep_index.html').format(
+        category_rows=''.join(rows[:3]),
+        numerical_rows=''.join(rows),
+    )
+
+
+def pep_card_html(number):
+    _, status, pep_type, _ = pep_kind(number)
+    return load_page('pep_card.html').format(
+        number=number,
+        title=f'Proposal number {number}',
+        status=status,
+        pep_type=pep_type,
+    )
+
+
+def build_site(pep_count=40):
+    """Собирает словарь URL → HTML-страница для всех режимов парсера."""
+    whats_new_url = MAIN_DOC_URL + 'whatsnew/'
+    pages = {
+        MAIN_DOC_URL: load_page('docs_index.html'),
+        MAIN_DOC_URL + 'download.html': load_page('download.html'),
+        whats_new_url: load_page('whatsnew_index.html'),
+        MAIN_PEP_URL: pep_index_html(pep_count),
+    }
+    article = load_page('whatsnew_article.html')
+    for version in WHATS_NEW_VERSIONS:
+        pages[f'{whats_new_url}{version}.html'] = article.format(
+            version=version, anchor=version.replace('.', '-'))
+    for number in pep_numbers(pep_count):
+        pages[pep_url(number)] = pep_card_html(number)
+    return pages
+
+
+def archive_urls():
+    return [
+        f'{MAIN_DOC_URL}archives/{name}' for name in ARCHIVE_NAMES
+    ]
@@ -0,0 +1,14 @@
+from benchmarks import run_benchmarks
+
+
+def test_benchmark_cases_run_offline():
+    results = [
+        run_benchmarks.run_case(case)
+        for case in run_benchmarks.benchmark_cases(pep_count=5, workers=2)
+    ]
+    names = {result['name'] for result in results}
+    assert {f'mode:{mode}' for mode in run_benchmarks.MODES} <= names, (
+        'Бенчмарк должен замерять все режимы парсера'
+    )
+    assert all(result['pages'] > 0 for result in results)
+    assert 'mode:download' in run_benchmarks.format_report(results)
@@ -0,0 +1,94 @@
+import os
+from pathlib import Path
+
+import pytest
+import requests_mock
+try:
+    from src import cache, main
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `cache.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `cache.py`'
+
+PAGE_URL = 'https://peps.python.org/pep-{number:04d}/'
+
+
+@pytest.fixture
+def lru_session(tmp_path):
+    def _lru_session(backend='sqlite', max_size=None):
+        return cache.LruCachedSession(
+            str(Path(tmp_path) / 'http_cache'),
+            backend=backend,
+            serializer=cache.compressed_serializer(),
+            max_size=max_size,
+            index_path=str(Path(tmp_path) / 'http_cache_index.sqlite')
+        )
+    return _lru_session
+
+
+def test_bodies_are_compressed(lru_session):
+    html = '<html><body>' + '<p>PEP</p>' * 2000 + '</body></html>'
+    session = lru_session()
+    with requests_mock.Mocker() as mock:
+        mock.get(PAGE_URL.format(number=1), text=html)
+        session.get(PAGE_URL.format(number=1))
+    assert session.get(PAGE_URL.format(number=1)).text == html
+    sizes = cache.entry_sizes(session.cache)
+    assert sum(sizes.values()) < len(html) / 5, (
+        'Тела ответов должны храниться в кеше в сжатом виде'
+    )
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'filesystem'])
+def test_trim_evicts_least_recently_used(lru_session, backend):
+    # Случайные данные не сжимаются, размер записи почти равен телу
+    bodies = {number: os.urandom(4096) for number in range(1, 4)}
+    session = lru_session(backend, max_size=10000)
+    with requests_mock.Mocker() as mock:
+        for number, body in bodies.items():
+            mock.get(PAGE_URL.format(number=number), content=body)
+            session.get(PAGE_URL.format(number=number))
+        session.get(PAGE_URL.format(number=1))
+    evicted, freed = session.trim()
+    assert evicted == 1 and freed > 4096
+    assert list(session.cache.urls()) == [
+        PAGE_URL.format(number=1), PAGE_URL.format(number=3)
+    ], 'Из кеша должна удаляться запись, к которой дольше всего не обращались'
+
+
+def test_trim_without_limit_keeps_entries(lru_session):
+    session = lru_session()
+    with requests_mock.Mocker() as mock:
+        mock.get(PAGE_URL.format(number=1), content=os.urandom(4096))
+        session.get(PAGE_URL.format(number=1))
+    assert session.trim() == (0, 0)
+    assert len(cache.entry_sizes(session.cache)) == 1
+
+
+def test_cache_stats_mode(lru_session):
+    session = lru_session()
+    with requests_mock.Mocker() as mock:
+        for number, size in ((1, 100), (2, 4096)):
+            mock.get(PAGE_URL.format(number=number),
+                     content=os.urandom(size))
+            session.get(PAGE_URL.format(number=number))
+        session.get(PAGE_URL.format(number=2))
+    got = dict(main.cache_stats(session, largest=1))
+    assert got['Записей'] == 2
+    assert (got['Попаданий'], got['Промахов']) == (1, 2)
+    assert got['Доля попаданий'] == '33.3%'
+    assert PAGE_URL.format(number=2) in got, (
+        'Отчёт cache-stats должен содержать крупнейшие записи'
+    )
+
+
+def test_cache_index_survives_session(lru_session):
+    session = lru_session()
+    with requests_mock.Mocker() as mock:
+        mock.get(PAGE_URL.format(number=1), text='PEP')
+        session.get(PAGE_URL.format(number=1))
+    session.close()
+    reopened = lru_session()
+    assert reopened.index.counters() == (0, 1), (
+        'Счётчики попаданий и промахов должны сохраняться между запусками'
+    )
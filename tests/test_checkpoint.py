@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import pytest
+try:
+    from src import checkpoint, main
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `checkpoint.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `checkpoint.py`'
+
+
+def test_checkpoint_flushes_periodically(tmp_path):
+    path = Path(tmp_path) / 'state' / 'run_checkpoint.jsonl'
+    with checkpoint.Checkpoint(path, every=2, interval=3600) as journal:
+        journal.add('a', ['A'])
+        assert checkpoint.load_checkpoint(path) == {}
+        journal.add('b', ['B'])
+        assert checkpoint.load_checkpoint(path) == {'a': ['A'], 'b': ['B']}, (
+            'Журнал должен сбрасываться на диск каждые every страниц'
+        )
+    assert not path.exists(), (
+        'После успешного прогона журнал должен удаляться'
+    )
+
+
+def test_checkpoint_skips_torn_line(tmp_path):
+    path = Path(tmp_path) / 'run_checkpoint.jsonl'
+    path.write_text('["a", ["A"]]\n["b", ["B', encoding='utf-8')
+    assert checkpoint.load_checkpoint(path) == {'a': ['A']}, (
+        'Недописанная строка журнала должна пропускаться'
+    )
+    with pytest.raises(RuntimeError):
+        with checkpoint.Checkpoint(path, resume=True) as journal:
+            journal.add('c', ['C'])
+            raise RuntimeError
+    assert checkpoint.load_checkpoint(path) == {'a': ['A'], 'c': ['C']}, (
+        'Прерванный прогон должен сохранять журнал с обработанными страницами'
+    )
+
+
+def test_pep_resume(monkeypatch, tmp_path, pep_mocker, tempfile_session):
+    import extractors
+
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    expected = main.pep(tempfile_session)
+    extract_pep_card = extractors.extract_pep_card
+
+    def interrupted(html, engine):
+        if 'Accepted' in html:
+            raise RuntimeError('Прогон прерван')
+        return extract_pep_card(html, engine)
+
+    monkeypatch.setattr(extractors, 'extract_pep_card', interrupted)
+    tempfile_session.cache.clear()
+    with pytest.raises(RuntimeError):
+        main.pep(tempfile_session, workers=1)
+    assert (Path(tmp_path) / 'state' / 'pep_checkpoint.jsonl').exists()
+
+    monkeypatch.setattr(extractors, 'extract_pep_card', extract_pep_card)
+    tempfile_session.cache.clear()
+    calls_before = pep_mocker.call_count
+    assert main.pep(tempfile_session, resume=True) == expected, (
+        'Продолженный прогон `pep` должен возвращать полную сводку'
+    )
+    assert pep_mocker.call_count - calls_before == 9, (
+        'С флагом --resume режим `pep` должен загружать индекс и только '
+        'карточки, не обработанные прерванным прогоном'
+    )
+    assert not list((Path(tmp_path) / 'state').iterdir()), (
+        'После успешного прогона журнал должен удаляться'
+    )
+
+
+def test_whats_new_resume(monkeypatch, tmp_path, whats_new_mocker,
+                          tempfile_session):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    expected = main.whats_new(tempfile_session)
+
+    tempfile_session.cache.clear()
+    results = main.whats_new(tempfile_session, workers=1, stream=True)
+    assert list(zip(range(2), results)) == list(enumerate(expected[:2]))
+    results.close()
+
+    tempfile_session.cache.clear()
+    calls_before = whats_new_mocker.call_count
+    assert main.whats_new(tempfile_session, resume=True) == expected
+    assert whats_new_mocker.call_count - calls_before == 6, (
+        'С флагом --resume режим `whats-new` должен загружать индекс '
+        'и только статьи, не обработанные прерванным прогоном'
+    )
+
+
+def test_served_modes_keep_journals(monkeypatch, tmp_path, site_mocker,
+                                    tempfile_session):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    journals = [main.checkpoint_path(name) for name in ('pep', 'whats-new')]
+    journals[0].parent.mkdir(parents=True)
+    for journal in journals:
+        journal.write_text('["url", ["result"]]\n', encoding='utf-8')
+    for source in main.served_modes(tempfile_session).values():
+        list(source())
+    for journal in journals:
+        assert journal.read_text(encoding='utf-8') == (
+            '["url", ["result"]]\n'
+        ), 'Обновления индекса `serve` не должны трогать журналы прогонов'
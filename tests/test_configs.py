@@ -1,5 +1,6 @@
 import pytest
 import argparse
+import requests_mock
 try:
     from src import configs
 except ModuleNotFoundError:
@@ -29,7 +30,7 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'ndjson', 'csv-gz', 'csv-zst', 'parquet'),
         'Дополнительные способы вывода данных'
     ),
 ])
@@ -64,3 +65,63 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+def parse_cli(*argv):
+    return configs.configure_argument_parser(['pep']).parse_args(
+        ['pep', *argv])
+
+
+def test_cache_settings_expire_rules():
+    got = configs.get_cache_settings(
+        parse_cli('--expire', 'peps.python.org/pep-0008*=60'))
+    patterns = list(got['urls_expire_after'])
+    assert patterns[0] == 'peps.python.org/pep-0008*', (
+        'Правила `--expire` должны проверяться раньше правил по умолчанию'
+    )
+    assert got['urls_expire_after']['peps.python.org/pep-0008*'] == 60
+    assert 'peps.python.org/pep-*' in patterns
+    assert got['always_revalidate'] is False
+
+
+def test_revalidation_treats_304_as_cache_hit():
+    from requests_cache import CachedSession
+    url = 'https://peps.python.org/pep-0008/'
+    session = CachedSession(
+        backend='memory', **configs.get_cache_settings(parse_cli('-r')))
+    with requests_mock.Mocker() as mock:
+        mock.get(url, [
+            {'text': 'PEP 8', 'headers': {'ETag': '"v1"'}},
+            {'status_code': 304, 'headers': {'ETag': '"v1"'}},
+        ])
+        session.get(url)
+        got = session.get(url)
+    assert mock.request_history[-1].headers.get('If-None-Match') == '"v1"', (
+        'В режиме `--revalidate` кеш должен отправлять условный запрос'
+    )
+    assert got.from_cache and got.text == 'PEP 8', (
+        'Ответ 304 должен отдавать страницу из кеша'
+    )
+
+
+def test_url_expiry_overrides_server_max_age():
+    from datetime import datetime, timedelta, timezone
+
+    from requests_cache import CachedSession
+    from src.constants import CACHE_URLS_EXPIRE_AFTER
+    url = 'https://peps.python.org/pep-0008/'
+    session = CachedSession(
+        backend='memory', **configs.get_cache_settings(parse_cli()))
+    with requests_mock.Mocker() as mock:
+        mock.get(url, text='PEP 8',
+                 headers={'Cache-Control': 'max-age=600'})
+        session.get(url)
+    (cached,) = session.cache.responses.values()
+    lifetime = cached.expires.replace(tzinfo=timezone.utc) - datetime.now(
+        timezone.utc)
+    expected = timedelta(seconds=CACHE_URLS_EXPIRE_AFTER[
+        'peps.python.org/pep-*'])
+    assert expected - timedelta(minutes=1) < lifetime <= expected, (
+        'Срок хранения карточек PEP должен задаваться правилом по шаблону '
+        'URL, а не заголовком Cache-Control ответа'
+    )
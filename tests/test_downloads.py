@@ -0,0 +1,138 @@
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+import requests_mock
+try:
+    from src import downloads
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `downloads.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `downloads.py`'
+
+ARCHIVE_URL = 'https://docs.python.org/3/archives/python-docs-pdf-a4.zip'
+
+
+def make_archive():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for number in range(20):
+            archive.writestr(f'doc-{number}.txt', f'page {number}\n' * 500)
+    return buffer.getvalue()
+
+
+def serve_ranges(body):
+    def callback(request, context):
+        range_header = request.headers.get('Range')
+        if range_header is None:
+            context.headers['Content-Length'] = str(len(body))
+            return body
+        start, end = range_header[len('bytes='):].split('-')
+        start = int(start)
+        end = int(end) if end else len(body) - 1
+        context.status_code = 206
+        context.headers['Content-Range'] = f'bytes {start}-{end}/{len(body)}'
+        return body[start:end + 1]
+    return callback
+
+
+@pytest.fixture
+def archive():
+    return make_archive()
+
+
+def test_stream_download(tmp_path, tempfile_session, archive):
+    path = Path(tmp_path) / 'docs.zip'
+    with requests_mock.Mocker() as mock:
+        mock.get(ARCHIVE_URL, content=serve_ranges(archive))
+        downloads.stream_download(
+            tempfile_session, ARCHIVE_URL, path, chunk_size=1024)
+    assert path.read_bytes() == archive
+    assert not path.with_name('docs.zip.part').exists(), (
+        'После загрузки временный файл должен быть переименован'
+    )
+    assert not tempfile_session.cache.contains(url=ARCHIVE_URL), (
+        'Архивы не должны сохраняться в кеш HTTP-запросов'
+    )
+
+
+def test_stream_download_resume(tmp_path, tempfile_session, archive):
+    path = Path(tmp_path) / 'docs.zip'
+    path.with_name('docs.zip.part').write_bytes(archive[:5000])
+    with requests_mock.Mocker() as mock:
+        mock.get(ARCHIVE_URL, content=serve_ranges(archive))
+        downloads.stream_download(tempfile_session, ARCHIVE_URL, path)
+        range_header = mock.last_request.headers.get('Range')
+    assert range_header == 'bytes=5000-', (
+        'Прерванная загрузка должна продолжаться запросом с Range'
+    )
+    assert path.read_bytes() == archive
+
+
+def test_stream_download_broken_archive(tmp_path, tempfile_session):
+    path = Path(tmp_path) / 'docs.zip'
+    with requests_mock.Mocker() as mock:
+        mock.get(ARCHIVE_URL, content=b'<html>Not found</html>')
+        with pytest.raises(BaseException) as excinfo:
+            downloads.stream_download(tempfile_session, ARCHIVE_URL, path)
+    assert excinfo.typename == 'DownloadError'
+    assert not path.exists()
+    assert not path.with_name('docs.zip.part').exists()
+
+
+def test_segmented_download(monkeypatch, tmp_path, tempfile_session,
+                            archive):
+    monkeypatch.setattr(downloads, 'SEGMENTED_DOWNLOAD_MIN_SIZE', 1024)
+    path = Path(tmp_path) / 'docs.zip'
+    with requests_mock.Mocker() as mock:
+        mock.head(ARCHIVE_URL, headers={
+            'Content-Length': str(len(archive)), 'Accept-Ranges': 'bytes'})
+        mock.get(ARCHIVE_URL, content=serve_ranges(archive))
+        downloads.segmented_download(
+            tempfile_session, ARCHIVE_URL, path, segments=3)
+        ranges = sorted(
+            request.headers['Range'] for request in mock.request_history
+            if request.method == 'GET'
+        )
+    assert len(ranges) == 3, (
+        'Большой архив должен скачиваться параллельными сегментами'
+    )
+    assert path.read_bytes() == archive
+
+
+def test_download_archives(tmp_path, tempfile_session, archive):
+    archives = [
+        (ARCHIVE_URL.replace('pdf-a4', archive_format),
+         Path(tmp_path) / f'{archive_format}.zip')
+        for archive_format in ('pdf-a4', 'pdf-letter', 'html')
+    ]
+    with requests_mock.Mocker() as mock:
+        for url, _ in archives[:2]:
+            mock.head(url, headers={'Content-Length': str(len(archive))})
+            mock.get(url, content=serve_ranges(archive))
+        mock.head(archives[2][0], status_code=404)
+        mock.get(archives[2][0], status_code=404)
+        got = downloads.download_archives(
+            tempfile_session, archives, workers=3)
+    assert got == [path for _, path in archives[:2]], (
+        'Функция `download_archives` должна вернуть пути скачанных '
+        'архивов и пропустить архивы с ошибками загрузки'
+    )
+
+
+def test_parallel_downloads_bypass_cache(tmp_path, tempfile_session,
+                                         stand_in_server):
+    archives = [
+        (f'{stand_in_server.url}/slow?delay={delay}',
+         Path(tmp_path) / f'{delay}.html')
+        for delay in (0.1, 0.5)
+    ]
+    got = downloads.download_archives(
+        tempfile_session, archives, workers=len(archives))
+    assert got == [path for _, path in archives]
+    assert stand_in_server.max_in_flight == len(archives)
+    assert not list(tempfile_session.cache.responses.keys()), (
+        'Параллельные загрузки архивов не должны попадать в кеш '
+        'HTTP-запросов'
+    )
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+try:
+    from src import extractors, main
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extractors.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extractors.py`'
+from tests.fixture_data.site_pages import build_site, pep_url
+
+ENGINES = ('bs4', 'lxml')
+
+
+@pytest.mark.parametrize('mode', ['whats-new', 'latest-versions', 'pep'])
+def test_engines_parity(site_mocker, tempfile_session, mode):
+    got = {
+        engine: main.MODE_TO_FUNCTION[mode](tempfile_session, engine=engine)
+        for engine in ENGINES
+    }
+    assert len(got['bs4']) > 1, (
+        f'Режим `{mode}` должен извлекать данные из записанных страниц'
+    )
+    assert got['bs4'] == got['lxml'], (
+        f'Движки bs4 и lxml должны давать одинаковый результат '
+        f'для режима `{mode}`'
+    )
+
+
+def test_engines_parity_download(monkeypatch, tmp_path, site_mocker,
+                                 tempfile_session):
+    downloaded = {}
+    for engine in ENGINES:
+        base_dir = Path(tmp_path) / engine
+        base_dir.mkdir()
+        monkeypatch.setattr(main, 'BASE_DIR', base_dir)
+        main.download(tempfile_session, engine=engine)
+        downloaded[engine] = sorted(
+            file.name for file in base_dir.glob('**/*.zip')
+        )
+    assert downloaded['bs4'] == ['python-3.13-docs-pdf-a4.zip']
+    assert downloaded['bs4'] == downloaded['lxml'], (
+        'Движки bs4 и lxml должны находить одну и ту же ссылку на архив'
+    )
+
+
+def test_pep_card_parity():
+    html = build_site()[pep_url(1)]
+    got = {
+        engine: extractors.extract_pep_card(html, engine)
+        for engine in ENGINES
+    }
+    assert got['bs4'] == got['lxml'] == (
+        'Final', 'Standards Track', 'PEP 1 – Proposal number 1'
+    )
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_missing_tag_exception(engine):
+    with pytest.raises(BaseException) as excinfo:
+        extractors.extract_pep_card('<html><body></body></html>', engine)
+    assert excinfo.typename == 'ParserFindTagException', (
+        f'Движок {engine} должен выбрасывать `ParserFindTagException`, '
+        'если тег не найден'
+    )
@@ -1,4 +1,6 @@
+from datetime import datetime, timedelta, timezone
 import pytest
+import requests
 from pathlib import Path
 try:
     from src import main
@@ -140,3 +142,145 @@ def test_mode_to_function():
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+@pytest.mark.parametrize('workers, parse_workers', [(1, 0), (4, 0), (4, 2)])
+def test_pep(pep_mocker, tempfile_session, workers, parse_workers):
+    got = main.pep(
+        tempfile_session, workers=workers, parse_workers=parse_workers)
+    assert got == [
+        ('Статус', 'Количество'),
+        ('Final', 3),
+        ('Rejected', 2),
+        ('Deferred', 1),
+        ('Accepted', 1),
+        ('Provisional', 1),
+        ('Active', 2),
+        ('Withdrawn', 1),
+        ('Superseded', 1),
+        ('Draft', 1),
+        ('Total', 13),
+    ], (
+        'Функция `pep` должна возвращать одинаковую сводку '
+        f'при workers={workers}'
+    )
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_whats_new_order(whats_new_mocker, tempfile_session, workers):
+    whats_new_mocker.get(
+        'https://docs.python.org/3/whatsnew/3.11.html',
+        exc=requests.ConnectionError
+    )
+    got = main.whats_new(tempfile_session, workers=workers)
+    assert [row[0] for row in got[1:]] == [
+        'https://docs.python.org/3/whatsnew/3.13.html',
+        'https://docs.python.org/3/whatsnew/3.12.html',
+        'https://docs.python.org/3/whatsnew/3.10.html',
+        'https://docs.python.org/3/whatsnew/2.0.html',
+        'https://docs.python.org/3/whatsnew/changelog.html',
+    ], (
+        'Функция `whats_new` должна сохранять порядок статей '
+        'и пропускать страницы с ошибками загрузки'
+    )
+
+
+def test_pep_incremental(monkeypatch, tmp_path, site_mocker,
+                         tempfile_session):
+    from tests.fixture_data.site_pages import pep_url
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    first = main.pep(tempfile_session, incremental=True)
+    first_requests = site_mocker.call_count
+
+    tempfile_session.cache.clear()
+    second = main.pep(tempfile_session, incremental=True)
+    assert second == first, (
+        'Инкрементальный режим `pep` должен возвращать полную сводку'
+    )
+    assert site_mocker.call_count - first_requests == 1, (
+        'Если индекс не изменился, инкрементальный режим `pep` '
+        'должен загружать только страницу индекса'
+    )
+
+    state_file = Path(tmp_path) / 'state' / 'pep_index.json'
+    state = state_file.read_text(encoding='utf-8')
+    state_file.write_text(
+        state.replace(pep_url(1), 'https://peps.python.org/pep-9999/'),
+        encoding='utf-8'
+    )
+    tempfile_session.cache.clear()
+    calls_before = site_mocker.call_count
+    main.pep(tempfile_session, incremental=True)
+    assert site_mocker.call_count - calls_before == 2, (
+        'Инкрементальный режим `pep` должен загружать заново '
+        'только новые и изменившиеся карточки'
+    )
+
+
+def test_pep_stream(pep_mocker, tempfile_session):
+    got = main.pep(tempfile_session, stream=True)
+    assert not isinstance(got, list), (
+        'С аргументом stream=True функция `pep` должна возвращать генератор'
+    )
+    assert next(got) == ('Статус', 'Количество')
+    assert list(got)[-1] == ('Total', 13), (
+        'Итоговая строка `pep` должна выводиться последней'
+    )
+
+
+def test_pep_store_and_query(monkeypatch, tmp_path, pep_mocker,
+                             tempfile_session):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    main.pep(tempfile_session, store=True)
+    calls_before = pep_mocker.call_count
+
+    got = main.query(
+        tempfile_session, status='Final', pep_type='Standards Track')
+    assert got[0] == ('Номер', 'Статус', 'Тип', 'Заголовок', 'Ссылка')
+    assert [row[0] for row in got[1:]] == [1], (
+        'Режим `query` должен выбирать PEP по статусу и типу'
+    )
+    mismatches = main.query(tempfile_session, mismatches=True)
+    assert [row[0] for row in mismatches[1:]] == [19, 21], (
+        'Режим `query` должен выбирать PEP с несовпадающими статусами'
+    )
+    assert pep_mocker.call_count == calls_before, (
+        'Режим `query` не должен обращаться к сети'
+    )
+
+
+def test_query_without_store(monkeypatch, tmp_path, tempfile_session):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    assert main.query(tempfile_session) == [
+        ('Номер', 'Статус', 'Тип', 'Заголовок', 'Ссылка')
+    ]
+
+
+def test_prefetch(site_mocker, tempfile_session):
+    first = dict(main.prefetch(tempfile_session, workers=4))
+    pages = first['Total']
+    assert first['Новые'] == pages == site_mocker.call_count, (
+        'Режим `prefetch` должен загружать индексные страницы, статьи '
+        'о версиях и карточки PEP'
+    )
+    second = dict(main.prefetch(tempfile_session, workers=4))
+    assert second['Без изменений'] == pages
+    assert site_mocker.call_count == pages, (
+        'Повторный `prefetch` должен брать страницы из кеша'
+    )
+
+    tempfile_session.cache.reset_expiration(
+        datetime.now(timezone.utc) - timedelta(days=1))
+    third = dict(main.prefetch(tempfile_session, workers=4))
+    assert third['Обновлённые'] == pages, (
+        'Устаревшие записи кеша должны учитываться как обновлённые'
+    )
+
+
+def test_prefetch_warms_cache_for_pep(site_mocker, tempfile_session):
+    main.prefetch(tempfile_session, workers=4)
+    calls_before = site_mocker.call_count
+    main.pep(tempfile_session, workers=4)
+    assert site_mocker.call_count == calls_before, (
+        'После `prefetch` режим `pep` должен работать из кеша'
+    )
@@ -0,0 +1,88 @@
+import gc
+import tracemalloc
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+try:
+    from src import main, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
+
+# Допустимый рост пика памяти на каждую дополнительную карточку PEP.
+# Дерево одной карточки занимает десятки килобайт, запись о ней —
+# сотни байт.
+PEAK_GROWTH_PER_PEP = 1024
+
+
+class PagesAdapter(BaseAdapter):
+    """Отдаёт страницы из словаря, не сохраняя историю запросов."""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = {url: html.encode('utf-8') for url, html in pages.items()}
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.pages[request.url]
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def transient_peak(pep_count, engine):
+    """
+    Замеряет, на сколько пик памяти при загрузке карточек PEP превышает
+    память, которая остаётся занятой после неё.
+    """
+    from tests.fixture_data.site_pages import build_site, pep_url
+
+    session = requests.Session()
+    session.mount('https://', PagesAdapter(build_site(pep_count)))
+    urls = [pep_url(number) for number in range(1, pep_count + 1)]
+    main.METRICS.reset()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        main.fetch_pep_cards(session, urls, 4, 0, engine)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - retained
+
+
+@pytest.mark.parametrize('engine', ['bs4', 'lxml'])
+def test_pep_cards_memory_is_flat(engine):
+    transient_peak(20, engine)
+    small, large = transient_peak(100, engine), transient_peak(600, engine)
+    assert large - small < PEAK_GROWTH_PER_PEP * 500, (
+        'Пик памяти при обработке карточек PEP не должен расти '
+        'с их количеством: деревья страниц нужно освобождать сразу '
+        'после извлечения данных'
+    )
+
+
+def test_parsed_soup_releases_tree():
+    from bs4 import Tag
+
+    html = '<html><body>' + '<p><b>x</b></p>' * 100 + '</body></html>'
+    gc.collect()
+    gc.disable()
+    try:
+        with utils.parsed_soup(html) as soup:
+            texts = [tag.text for tag in soup.find_all('b')]
+        del soup
+        alive = sum(isinstance(obj, Tag) for obj in gc.get_objects())
+    finally:
+        gc.enable()
+    assert texts == ['x'] * 100
+    assert alive < 10, (
+        'После выхода из parsed_soup дерево должно освобождаться '
+        'без сборщика циклического мусора'
+    )
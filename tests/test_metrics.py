@@ -0,0 +1,68 @@
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+try:
+    from src import main, metrics, outputs
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+
+
+@pytest.fixture
+def collected_metrics(site_mocker, tempfile_session):
+    # main импортирует модуль metrics из src под своим именем
+    collector = main.METRICS
+    collector.reset()
+    main.pep(tempfile_session, workers=2)
+    main.pep(tempfile_session, workers=2)
+    yield collector.summary()
+    collector.reset()
+
+
+def test_metrics_summary(collected_metrics):
+    assert collected_metrics['pages'] > 1
+    assert collected_metrics['cache_hits'] > 0, (
+        'Повторные загрузки из кеша должны учитываться в метриках'
+    )
+    assert collected_metrics['bytes_received'] > 0
+    for name in metrics.TIMINGS:
+        assert set(collected_metrics[name]) >= {'p50', 'p90', 'p99', 'max'}, (
+            f'Для метрики `{name}` должны считаться перцентили'
+        )
+
+
+def test_cache_hits_receive_no_bytes(site_mocker, tempfile_session):
+    collector = main.METRICS
+    main.pep(tempfile_session, workers=2)
+    collector.reset()
+    main.pep(tempfile_session, workers=2)
+    summary = collector.summary()
+    collector.reset()
+    assert summary['cache_misses'] == 0
+    assert summary['bytes_received'] == 0, (
+        'Ответы из кеша не должны учитываться в полученных байтах'
+    )
+
+
+@pytest.mark.parametrize('metrics_format, marker', [
+    ('json', '"cache_hits"'),
+    ('prometheus', 'parser_fetch_seconds{mode="pep",quantile="0.5"}'),
+])
+def test_metrics_output(tmp_path, metrics_format, marker):
+    file_path = Path(tmp_path) / 'metrics.out'
+    main.METRICS.reset()
+    main.METRICS.record('https://peps.python.org/', from_cache=False,
+                        fetch_seconds=0.1, bytes=10)
+    outputs.metrics_output(Namespace(
+        mode='pep', metrics=metrics_format, metrics_path=file_path))
+    main.METRICS.reset()
+    assert marker in file_path.read_text(encoding='utf-8'), (
+        f'Проверьте формат файла с метриками `{metrics_format}`'
+    )
+
+
+def test_percentile():
+    assert metrics.percentile([3, 1, 2, 4], 0.5) == 2
+    assert metrics.percentile([5], 0.99) == 5
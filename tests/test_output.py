@@ -1,3 +1,7 @@
+import csv
+import gzip
+import json
+import sys
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
@@ -90,3 +94,105 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+@pytest.mark.parametrize('output_format', [None, 'pretty', 'file'])
+def test_control_output_iterable(monkeypatch, tmp_path, capsys, records,
+                                 output_format):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = records('whats-new')
+    outputs.control_output(
+        iter(rows), cli_args('whats-new', output_format))
+    if output_format == 'file':
+        saved = next(Path(tmp_path).glob('**/*.csv')).read_text(
+            encoding='utf-8')
+        assert rows[1][0] in saved
+    else:
+        captured_out, _ = capsys.readouterr()
+        assert rows[1][0] in captured_out, (
+            'Функции вывода должны принимать итератор строк'
+        )
+
+
+def test_default_output_streams_rows(capsys):
+    printed = []
+
+    def rows():
+        yield ('Статус', 'Количество')
+        printed.append(capsys.readouterr().out)
+        yield ('Total', 1)
+
+    outputs.default_output(rows())
+    assert 'Статус Количество' in printed[0], (
+        'Функция `default_output` должна выводить строки по мере получения'
+    )
+
+
+def test_ndjson_output(monkeypatch, tmp_path, records):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = records('pep')
+    outputs.control_output(iter(rows), cli_args('pep', 'ndjson'))
+    saved = next(Path(tmp_path).glob('**/pep_*.ndjson'))
+    lines = saved.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [
+        dict(zip(rows[0], row)) for row in rows[1:]
+    ], 'NDJSON должен содержать по объекту на строку с ключами из заголовка'
+
+
+def test_gzip_csv_output(monkeypatch, tmp_path, records):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = records('whats-new')
+    outputs.control_output(iter(rows), cli_args('whats-new', 'csv-gz'))
+    saved = next(Path(tmp_path).glob('**/whats-new_*.csv.gz'))
+    with gzip.open(saved, 'rt', encoding='utf-8', newline='') as f:
+        assert [tuple(row) for row in csv.reader(f)] == [
+            tuple(map(str, row)) for row in rows
+        ], 'Сжатый CSV должен совпадать с обычным'
+
+
+@pytest.mark.parametrize('output_format, package', [
+    ('csv-zst', 'zstandard'),
+    ('parquet', 'pyarrow'),
+])
+def test_optional_output_dependency(monkeypatch, tmp_path, records,
+                                    output_format, package):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setitem(sys.modules, package, None)
+    with pytest.raises(outputs.MissingDependencyError):
+        outputs.control_output(
+            iter(records('pep')), cli_args('pep', output_format))
+
+
+def test_zstd_csv_output(monkeypatch, tmp_path, records):
+    zstandard = pytest.importorskip('zstandard')
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = records('whats-new')
+    outputs.control_output(iter(rows), cli_args('whats-new', 'csv-zst'))
+    saved = next(Path(tmp_path).glob('**/whats-new_*.csv.zst'))
+    with open(saved, 'rb') as raw_file:
+        text = zstandard.ZstdDecompressor().stream_reader(
+            raw_file).read().decode('utf-8')
+    assert [tuple(row) for row in csv.reader(text.splitlines())] == [
+        tuple(map(str, row)) for row in rows
+    ], 'Сжатый zstd CSV должен совпадать с обычным'
+
+
+def test_parquet_output(monkeypatch, tmp_path):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = [
+        ('Показатель', 'Значение', 'Записей'),
+        ('Записей в кеше', 120, 120),
+        ('Доля попаданий', '12.3%', 15),
+        ('Размер', None, 7),
+    ]
+    outputs.control_output(iter(rows), cli_args('cache-stats', 'parquet'))
+    saved = next(Path(tmp_path).glob('**/cache-stats_*.parquet'))
+    table = parquet.read_table(saved)
+    assert table.column_names == list(rows[0])
+    assert table.column('Записей').to_pylist() == [120, 15, 7], (
+        'Числовые столбцы должны сохраняться как числа'
+    )
+    assert table.column('Значение').to_pylist() == ['120', '12.3%', None], (
+        'Столбцы со значениями разных типов должны сохраняться как строки'
+    )
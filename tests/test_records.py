@@ -0,0 +1,66 @@
+import json
+import sys
+
+try:
+    from src import main, records
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `records.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `records.py`'
+
+
+def test_records_are_rows():
+    card = records.PepCard.make('Final', 'Standards Track', 'PEP 8')
+    assert card == ('Final', 'Standards Track', 'PEP 8'), (
+        'Записи должны сравниваться с кортежами строк результата'
+    )
+    assert not hasattr(card, '__dict__'), (
+        'Записи не должны хранить атрибуты в словаре экземпляра'
+    )
+    assert json.loads(json.dumps(card)) == list(card)
+    assert records.VersionEntry.HEADER == ('Ссылка', 'Версия', 'Статус')
+
+
+def test_record_strings_are_interned():
+    status = ''.join(['Fi', 'nal'])
+    first = records.PepCard.make('Final', 'Informational', 'PEP 1')
+    second = records.PepCard.make(status, ''.join(['Inform', 'ational']),
+                                  'PEP 2')
+    assert first.status is second.status, (
+        'Одинаковые статусы PEP должны ссылаться на одну строку'
+    )
+    assert first.type is second.type
+    assert records.PepIndexRow.make(None, 'url', 'title').table_status is None
+    assert records.intern_text('S') is sys.intern('S')
+
+
+def test_count_by_and_counter_rows():
+    cards = [
+        records.PepCard.make(status, 'Process', '')
+        for status in ('Final', 'Active', 'Final', 'Draft', 'Final')
+    ]
+    counter = records.count_by(cards, 'status')
+    assert list(records.counter_rows(counter)) == [
+        ('Final', 3), ('Active', 1), ('Draft', 1), ('Total', 5)
+    ], 'Строки сводки должны идти в порядке первого появления значений'
+
+
+def test_pep_records_match_store_columns(monkeypatch, tmp_path, pep_mocker,
+                                         tempfile_session):
+    from pathlib import Path
+    import store
+
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    saved = []
+    monkeypatch.setattr(
+        store, 'save_pep_records',
+        lambda db, pep_records: saved.extend(pep_records) or len(saved))
+    main.pep(tempfile_session, store=True)
+    assert saved and all(
+        getattr(record, '_fields', None) == records.PepRecord._fields
+        for record in saved
+    ), 'Режим pep должен передавать в базу записи PepRecord'
+    columns = store.UPSERT_PEP.split('(')[1].split(')')[0]
+    assert records.PepRecord._fields == tuple(
+        column.strip() for column in columns.split(',')
+    ), 'Поля PepRecord должны идти в порядке столбцов UPSERT_PEP'
@@ -0,0 +1,196 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+import requests_mock
+try:
+    from src import scheduler, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `scheduler.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `scheduler.py`'
+
+
+def test_token_bucket_limits_rate(stand_in_server):
+    fetcher = scheduler.FetchScheduler(rate=20, burst=1)
+    with requests.Session() as session:
+        for _ in range(6):
+            fetcher.get(session, f'{stand_in_server.url}/ok')
+    times = stand_in_server.request_times
+    assert times[-1] - times[0] >= 0.2, (
+        'Запросы к хосту не должны превышать заданную частоту'
+    )
+
+
+def test_cache_hits_skip_rate_limit(stand_in_server, tempfile_session):
+    fetcher = scheduler.FetchScheduler(rate=2, burst=1)
+    url = f'{stand_in_server.url}/ok'
+    fetcher.get(tempfile_session, url)
+    started = time.monotonic()
+    for _ in range(5):
+        assert fetcher.get(tempfile_session, url).from_cache
+    assert time.monotonic() - started < 0.4, (
+        'Ответы из кеша не должны ждать разрешения на запрос'
+    )
+    assert stand_in_server.hits['/ok'] == 1
+
+
+def test_fetch_time_excludes_waiting(stand_in_server):
+    fetcher = scheduler.FetchScheduler(rate=5, burst=1)
+    url = f'{stand_in_server.url}/ok'
+    collector = utils.METRICS
+    collector.reset()
+    with requests.Session() as session:
+        for _ in range(3):
+            fetcher.get(session, url)
+    summary = collector.summary()
+    collector.reset()
+    assert summary['wait_seconds']['sum'] >= 0.3, (
+        'Ожидание разрешения на запрос должно попадать в wait_seconds'
+    )
+    assert summary['fetch_seconds']['sum'] < 0.3, (
+        'Время ожидания не должно попадать в fetch_seconds'
+    )
+
+
+def test_retry_after_is_respected(stand_in_server):
+    fetcher = scheduler.FetchScheduler()
+    url = f'{stand_in_server.url}/throttle/page?count=2&retry_after=0.2'
+    with requests.Session() as session:
+        response = fetcher.get(session, url)
+    times = stand_in_server.request_times
+    assert response.status_code == 200, (
+        'Ответ 429 должен повторяться после паузы из Retry-After'
+    )
+    assert len(times) == 3
+    assert times[1] - times[0] >= 0.2 and times[2] - times[1] >= 0.2, (
+        'Повторный запрос должен ждать время из заголовка Retry-After'
+    )
+    assert fetcher.host(url).concurrency.limit < fetcher.max_concurrency, (
+        'Ответ 429 должен снижать предел одновременных запросов'
+    )
+
+
+def test_throttled_response_returned_after_retries(stand_in_server):
+    fetcher = scheduler.FetchScheduler(throttle_retries=1)
+    url = f'{stand_in_server.url}/throttle/page?count=5'
+    with requests.Session() as session:
+        response = fetcher.get(session, url)
+    assert response.status_code == 429
+    assert stand_in_server.hits['/throttle/page'] == 2
+
+
+def test_concurrency_limit(stand_in_server):
+    fetcher = scheduler.FetchScheduler(max_concurrency=2)
+    url = f'{stand_in_server.url}/slow?delay=0.05'
+    with requests.Session() as session, ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: fetcher.get(session, url), range(8)))
+    assert stand_in_server.max_in_flight <= 2, (
+        'Число одновременных запросов к хосту не должно превышать предел'
+    )
+
+
+def test_aimd_backs_off_on_rising_latency():
+    limiter = scheduler.AimdLimiter(max_limit=8)
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(latency=0.01)
+    assert limiter.limit == 8
+    limiter.acquire()
+    limiter.release(latency=0.5)
+    assert limiter.limit == 4, (
+        'Рост задержки ответа должен вдвое снижать предел'
+    )
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release(latency=0.01)
+    assert 4 < limiter.limit < 6, (
+        'Предел должен расти постепенно после нормальных ответов'
+    )
+
+
+def test_retry_after_http_date():
+    response = requests.Response()
+    retry_at = time.time() + 5
+    response.headers['Retry-After'] = time.strftime(
+        '%a, %d %b %Y %H:%M:%S GMT', time.gmtime(retry_at))
+    assert 3 < scheduler.retry_after_seconds(response) <= 5
+
+
+def test_network_errors_are_retried(stand_in_server):
+    fetcher = scheduler.FetchScheduler(retry_backoff=0)
+    with requests.Session() as session:
+        response = fetcher.get(
+            session, f'{stand_in_server.url}/drop/page?count=2')
+    assert response.status_code == 200, (
+        'Запрос должен повторяться после сетевой ошибки'
+    )
+    assert stand_in_server.hits['/drop/page'] == 3
+
+
+def test_retry_backoff_has_jitter(monkeypatch):
+    delays = []
+    monkeypatch.setattr(scheduler.time, 'sleep', delays.append)
+    fetcher = scheduler.FetchScheduler(retry_backoff=1)
+    for attempt in range(6):
+        fetcher.retry_pause('https://example.com/', attempt, 'ошибка')
+    assert all(
+        0 <= delay <= min(scheduler.RETRY_BACKOFF_MAX, 2 ** attempt)
+        for attempt, delay in enumerate(delays)
+    ), 'Пауза перед повтором должна быть случайной и ограниченной'
+
+
+def test_circuit_breaker_fails_fast():
+    fetcher = scheduler.FetchScheduler(
+        retries=1, retry_backoff=0, failure_threshold=3, reset_timeout=60)
+    urls = [f'https://down.example.com/{number}' for number in range(10)]
+    errors = []
+    with requests_mock.Mocker() as mock, requests.Session() as session:
+        mock.get(requests_mock.ANY, exc=requests.ConnectTimeout)
+        for url in urls:
+            try:
+                fetcher.get(session, url)
+            except (requests.RequestException,
+                    scheduler.CircuitOpenError) as error:
+                errors.append(error)
+    assert len(errors) == len(urls), 'Каждый запрос должен завершиться ошибкой'
+    assert mock.call_count == 3, (
+        'После серии ошибок запросы к хосту не должны отправляться'
+    )
+    assert all(
+        isinstance(error, scheduler.CircuitOpenError) for error in errors[1:]
+    )
+
+
+def test_circuit_breaker_recovers():
+    fetcher = scheduler.FetchScheduler(
+        retries=0, failure_threshold=1, reset_timeout=0.05)
+    url = 'https://flaky.example.com/'
+    with requests_mock.Mocker() as mock, requests.Session() as session:
+        mock.get(url, [{'exc': requests.ConnectionError},
+                       {'text': 'ok'}])
+        with pytest.raises(requests.ConnectionError):
+            fetcher.get(session, url)
+        with pytest.raises(scheduler.CircuitOpenError):
+            fetcher.get(session, url)
+        time.sleep(0.05)
+        assert fetcher.get(session, url).text == 'ok', (
+            'После паузы пробный запрос должен снова открывать доступ к хосту'
+        )
+
+
+def test_get_response_counts_failures(fetch_scheduler):
+    url = 'https://down.example.com/page'
+    fetch_scheduler.configure(retries=2, retry_backoff=0)
+    collector = utils.METRICS
+    collector.reset()
+    with requests_mock.Mocker() as mock, requests.Session() as session:
+        mock.get(url, exc=requests.ConnectionError)
+        with pytest.raises(utils.PageLoadError):
+            utils.get_response(session, url)
+    summary = collector.summary()
+    collector.reset()
+    assert (summary['retries'], summary['failures']) == (2, 1), (
+        'Повторы и ошибки загрузки должны учитываться в метриках'
+    )
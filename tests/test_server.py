@@ -0,0 +1,187 @@
+import http.client
+import json
+import socket
+import threading
+import time
+from pathlib import Path
+
+import pytest
+try:
+    from src import main, server
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `server.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `server.py`'
+
+PEP_ROWS = [('Статус', 'Количество'), ('Final', 2), ('Total', 2)]
+
+
+def broken_source():
+    raise RuntimeError('Страница недоступна')
+
+
+@pytest.fixture
+def index():
+    return server.ResultIndex({'pep': lambda: PEP_ROWS,
+                               'broken': broken_source})
+
+
+@pytest.fixture
+def running_server(index):
+    http_server = server.make_server(index, '127.0.0.1', 0)
+    thread = threading.Thread(target=http_server.serve_forever)
+    thread.start()
+    yield http_server
+    http_server.shutdown()
+    http_server.server_close()
+    thread.join()
+
+
+def get_json(connection, path):
+    connection.request('GET', path)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_result_index_refresh(index):
+    assert index.get('pep') is None
+    assert index.refresh() == 1, (
+        'Режим, завершившийся ошибкой, не должен считаться обновлённым'
+    )
+    body = json.loads(index.get('pep'))
+    assert body['header'] == ['Статус', 'Количество']
+    assert body['rows'] == [['Final', 2], ['Total', 2]]
+    assert index.get('broken') is None
+
+
+def test_result_index_keeps_previous_result():
+    results = iter([PEP_ROWS])
+    index = server.ResultIndex({'pep': lambda: next(results)})
+    index.refresh()
+    before = index.get('pep')
+    index.refresh()
+    assert index.get('pep') == before, (
+        'Если режим завершился ошибкой, в индексе должен остаться '
+        'его предыдущий результат'
+    )
+
+
+def test_server_answers_from_index(index, running_server):
+    host, port = running_server.server_address
+    connection = http.client.HTTPConnection(host, port, timeout=5)
+    assert get_json(connection, '/pep')[0] == 503, (
+        'До первого обновления индекса сервер должен отвечать 503'
+    )
+    index.refresh()
+    status, body = get_json(connection, '/pep')
+    assert status == 200
+    assert body['rows'] == [['Final', 2], ['Total', 2]]
+    assert get_json(connection, '/whats-new')[0] == 404
+    status, summary = get_json(connection, '/')
+    assert summary['pep'] == body['refreshed_at']
+    assert summary['broken'] is None
+    connection.close()
+
+
+def test_server_latency(index, running_server):
+    index.refresh()
+    host, port = running_server.server_address
+    connection = http.client.HTTPConnection(host, port, timeout=5)
+    timings = []
+    for _ in range(200):
+        started = time.perf_counter()
+        get_json(connection, '/pep')
+        timings.append(time.perf_counter() - started)
+    connection.close()
+    assert sorted(timings)[len(timings) // 2] < 0.005, (
+        'Сервер должен отвечать из индекса без повторной обработки данных'
+    )
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'),
+                    reason='Unix-сокеты не поддерживаются')
+def test_server_unix_socket(index, tmp_path):
+    socket_path = Path(tmp_path) / 'parser.sock'
+    index.refresh()
+    unix_server = server.make_server(index, None, None, socket_path)
+    thread = threading.Thread(target=unix_server.serve_forever)
+    thread.start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(str(socket_path))
+            client.sendall(b'GET /pep HTTP/1.1\r\nHost: localhost\r\n'
+                           b'Connection: close\r\n\r\n')
+            response = b''
+            while chunk := client.recv(65536):
+                response += chunk
+    finally:
+        unix_server.shutdown()
+        unix_server.server_close()
+        thread.join()
+    assert response.startswith(b'HTTP/1.1 200')
+    assert json.loads(response.split(b'\r\n\r\n', 1)[1])['mode'] == 'pep'
+    assert not socket_path.exists(), (
+        'После остановки сервера файл сокета должен удаляться'
+    )
+
+
+def test_index_refresher(index):
+    refresher = server.IndexRefresher(index, interval=3600)
+    refresher.start()
+    deadline = time.monotonic() + 5
+    while index.get('pep') is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    refresher.stop()
+    assert index.get('pep') is not None, (
+        'Индекс должен обновляться сразу после запуска'
+    )
+    assert not refresher.is_alive()
+
+
+def test_served_modes_match_cli(site_mocker, tempfile_session):
+    index = server.ResultIndex(main.served_modes(tempfile_session))
+    assert index.refresh() == 3
+    for mode in ('pep', 'latest-versions', 'whats-new'):
+        body = json.loads(index.get(mode))
+        rows = main.MODE_TO_FUNCTION[mode](tempfile_session)
+        assert [body['header'], *body['rows']] == [
+            list(row) for row in rows
+        ], f'Сервер должен отдавать те же строки, что и режим {mode}'
+
+
+def test_index_refresher_runs_after_refresh(index):
+    calls = []
+    refresher = server.IndexRefresher(
+        index, interval=0.01, after_refresh=lambda: calls.append(1))
+    refresher.start()
+    deadline = time.monotonic() + 5
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    refresher.stop()
+    assert len(calls) >= 2, (
+        'after_refresh должен вызываться после каждого обновления индекса'
+    )
+
+
+def test_serve_trims_cache_after_refresh(monkeypatch, tempfile_session):
+    import server as served
+
+    trimmed = []
+
+    def trim():
+        trimmed.append(1)
+        return 0, 0
+
+    monkeypatch.setattr(main, 'served_modes', lambda *args: {})
+    monkeypatch.setattr(tempfile_session, 'trim', trim, raising=False)
+
+    def run_once(index, host, port, socket_path, refresh_interval,
+                 after_refresh=None):
+        index.refresh()
+        after_refresh()
+
+    monkeypatch.setattr(served, 'run_server', run_once)
+    main.serve(tempfile_session)
+    assert trimmed == [1], (
+        'Режим `serve` должен очищать кеш после каждого обновления индекса'
+    )
@@ -0,0 +1,109 @@
+import argparse
+from pathlib import Path
+
+import pytest
+try:
+    from src import configs, main, shards
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `shards.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `shards.py`'
+
+SHARD_COUNT = 3
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1/1', (1, 1)),
+    ('2/4', (2, 4)),
+])
+def test_shard_spec(value, expected):
+    assert configs.shard_spec(value) == expected
+
+
+@pytest.mark.parametrize('value', ['0/4', '5/4', '2', 'a/b', '1/0'])
+def test_shard_spec_invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        configs.shard_spec(value)
+
+
+def test_select_shard_partitions_rows():
+    from src.records import PepIndexRow
+
+    rows = [
+        PepIndexRow.make('SF', f'https://peps.python.org/pep-{number:04d}/',
+                         '')
+        for number in range(200)
+    ]
+    parts = [
+        shards.select_shard(rows, (number, SHARD_COUNT))
+        for number in range(1, SHARD_COUNT + 1)
+    ]
+    assert sorted(row for part in parts for row in part) == sorted(rows), (
+        'Каждая строка индекса должна попадать ровно в один шард'
+    )
+    assert all(len(part) > 40 for part in parts), (
+        'Строки индекса должны распределяться по шардам равномерно'
+    )
+
+
+def run_shards(session, shard_dir):
+    return [
+        main.pep(session, shard=(number, SHARD_COUNT), shard_dir=shard_dir)
+        for number in range(1, SHARD_COUNT + 1)
+    ]
+
+
+def test_merge_matches_full_run(tmp_path, site_mocker, tempfile_session):
+    shard_dir = Path(tmp_path) / 'shards'
+    partial_results = run_shards(tempfile_session, shard_dir)
+    full_result = main.pep(tempfile_session)
+
+    assert len(list(shard_dir.iterdir())) == SHARD_COUNT
+    assert sum(result[-1][1] for result in partial_results) == (
+        full_result[-1][1]
+    ), 'Итоги шардов должны в сумме давать итог полного прогона'
+    assert main.merge(tempfile_session, shard_dir=shard_dir) == full_result, (
+        'Режим merge должен выводить ту же сводку, что и pep без шардов'
+    )
+
+
+def test_merge_rejects_incomplete_shards(tmp_path, site_mocker,
+                                         tempfile_session):
+    shard_dir = Path(tmp_path) / 'shards'
+    run_shards(tempfile_session, shard_dir)
+    summaries = shards.load_shards(shard_dir)
+
+    with pytest.raises(shards.ShardMergeError):
+        shards.merge_shards(summaries[1:])
+    summaries[0]['index_digest'] = 'другой индекс'
+    with pytest.raises(shards.ShardMergeError):
+        shards.merge_shards(summaries)
+    with pytest.raises(shards.ShardMergeError):
+        shards.load_shards(Path(tmp_path) / 'empty')
+
+
+def test_incremental_shards_keep_separate_state(monkeypatch, tmp_path,
+                                                site_mocker,
+                                                tempfile_session):
+    monkeypatch.setattr(main, 'BASE_DIR', Path(tmp_path))
+    main.pep(tempfile_session, incremental=True)
+    for number in range(1, SHARD_COUNT + 1):
+        tempfile_session.cache.clear()
+        main.pep(tempfile_session, incremental=True,
+                 shard=(number, SHARD_COUNT))
+
+    tempfile_session.cache.clear()
+    calls_before = site_mocker.call_count
+    main.pep(tempfile_session, incremental=True)
+    assert site_mocker.call_count - calls_before == 1, (
+        'Инкрементальные прогоны шардов не должны затирать состояние '
+        'полного прогона `pep`'
+    )
+
+    tempfile_session.cache.clear()
+    calls_before = site_mocker.call_count
+    main.pep(tempfile_session, incremental=True, shard=(1, SHARD_COUNT))
+    assert site_mocker.call_count - calls_before == 1, (
+        'Повторный инкрементальный прогон шарда должен брать карточки '
+        'из состояния шарда'
+    )
@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import pytest
+import requests
+import requests_mock
+try:
+    from src import main, snapshot
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `snapshot.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `snapshot.py`'
+
+
+def page_response(html, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers['Content-Type'] = 'text/html; charset=utf-8'
+    response._content = html.encode('utf-8')
+    return response
+
+
+def test_snapshot_roundtrip(tmp_path):
+    path = Path(tmp_path) / 'site.snap'
+    with snapshot.SnapshotWriter(path) as writer:
+        writer.add('https://peps.python.org/#numerical-index',
+                   page_response('<h1>Индекс</h1>'))
+        writer.add('https://peps.python.org/pep-0404/',
+                   page_response('Not found', 404))
+
+    archive = snapshot.SnapshotArchive(path)
+    assert len(archive) == 2
+    assert archive.get('https://peps.python.org/') == (
+        200, 'text/html; charset=utf-8', '<h1>Индекс</h1>'.encode('utf-8')
+    ), 'Якорь в URL не должен влиять на поиск страницы в снимке'
+    assert archive.get('https://peps.python.org/pep-0404/')[0] == 404
+    assert archive.get('https://peps.python.org/pep-0001/') is None
+    archive.close()
+
+
+def test_snapshot_writer_removes_partial_file(tmp_path):
+    path = Path(tmp_path) / 'site.snap'
+    with pytest.raises(RuntimeError):
+        with snapshot.SnapshotWriter(path) as writer:
+            writer.add('https://peps.python.org/', page_response('PEP'))
+            raise RuntimeError
+    assert list(Path(tmp_path).iterdir()) == [], (
+        'Прерванная запись снимка не должна оставлять файлов'
+    )
+
+
+def test_broken_snapshot(tmp_path):
+    path = Path(tmp_path) / 'site.snap'
+    path.write_bytes(b'<html></html>')
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.SnapshotArchive(path)
+
+
+def test_replay_matches_live_run(tmp_path, tempfile_session):
+    from tests.fixture_data.site_pages import build_site
+    path = Path(tmp_path) / 'site.snap'
+    with requests_mock.Mocker() as mock:
+        for url, html in build_site().items():
+            mock.get(url, text=html)
+        got = main.snapshot(tempfile_session, snapshot_path=path)
+        loaded_pages = mock.call_count
+        expected = {
+            name: main.MODE_TO_FUNCTION[name](tempfile_session)
+            for name in ('whats-new', 'latest-versions', 'pep')
+        }
+    snapshot_file, pages, errors, size = got[1]
+    assert (snapshot_file, errors, size) == (
+        str(path), 0, path.stat().st_size)
+    assert pages == loaded_pages, (
+        'Режим `snapshot` должен сохранять каждую загруженную страницу'
+    )
+
+    session = snapshot.replay_session(path)
+    for name, rows in expected.items():
+        assert main.MODE_TO_FUNCTION[name](session) == rows, (
+            f'Режим `{name}` должен давать по снимку тот же результат'
+        )
+    with pytest.raises(requests.ConnectionError):
+        session.get('https://docs.python.org/3/missing.html')
+    session.close()
+
+
+@pytest.mark.parametrize('mode', ['cache-stats', 'prefetch'])
+def test_replay_rejected_for_cache_modes(monkeypatch, tmp_path, capsys,
+                                         mode):
+    import configs
+
+    monkeypatch.setattr(configs, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(
+        'sys.argv', ['main.py', mode, '--replay', str(tmp_path / 'pages')])
+    with pytest.raises(SystemExit) as error:
+        main.main()
+    assert error.value.code == 2
+    assert '--replay' in capsys.readouterr().err, (
+        f'Режим `{mode}` с --replay должен завершаться понятной ошибкой '
+        'разбора аргументов'
+    )
@@ -0,0 +1,113 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+SRC_DIR = BASE_DIR / 'src'
+
+# Предельное время импорта модуля main, мкс. До отложенных импортов
+# запуск занимал около 280 мс, из них requests_cache — больше половины.
+STARTUP_BUDGET_US = 150_000
+# Пакеты, которые не должны загружаться при запуске парсера
+HEAVY_PACKAGES = ('requests', 'requests_cache', 'urllib3', 'bs4', 'lxml',
+                  'tqdm', 'prettytable')
+
+HELP_CODE = '''
+import main
+modes = {**main.MODE_TO_FUNCTION, **main.SERVICE_MODE_TO_FUNCTION}
+main.configure_argument_parser(modes.keys()).parse_args(['--help'])
+'''
+
+LATEST_VERSIONS_CODE = '''
+import sys
+from benchmarks.run_benchmarks import mock_session
+from tests.fixture_data.site_pages import build_site
+import main
+session, _ = mock_session(build_site(1))
+main.latest_versions(session)
+print(*sorted(sys.modules))
+'''
+
+QUERY_CODE = '''
+import sys
+from pathlib import Path
+import configs
+import main
+configs.BASE_DIR = main.BASE_DIR = Path(sys.argv[1])
+sys.argv = ['main.py', 'query']
+main.main()
+print(*sorted(sys.modules))
+'''
+
+
+def import_times(code):
+    """
+    Выполняет код в отдельном интерпретаторе с -X importtime.
+
+    Возвращает накопленное время импорта по именам модулей в мкс.
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize('code', ['import main', HELP_CODE],
+                         ids=['import', 'help'])
+def test_startup_skips_heavy_imports(code):
+    modules = import_times(code)
+    loaded = sorted(
+        name for name in modules
+        if name.split('.')[0] in HEAVY_PACKAGES
+    )
+    assert not loaded, (
+        f'При запуске парсера не должны загружаться модули {loaded}: '
+        'импортируйте их в функциях, которым они нужны'
+    )
+
+
+def test_startup_import_time_budget():
+    main_import_us = import_times('import main')['main']
+    assert main_import_us < STARTUP_BUDGET_US, (
+        f'Импорт main занял {main_import_us / 1000:.0f} мс, '
+        f'ожидалось меньше {STARTUP_BUDGET_US / 1000:.0f} мс'
+    )
+
+
+def test_latest_versions_imports_only_its_dependencies():
+    completed = subprocess.run(
+        [sys.executable, '-c', LATEST_VERSIONS_CODE],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': str(SRC_DIR)})
+    modules = set(completed.stdout.split())
+    assert 'extractors' in modules
+    unused = {'tqdm', 'prettytable', 'requests_cache', 'downloads', 'store',
+              'snapshot'} & modules
+    assert not unused, (
+        f'Режим latest-versions не должен загружать модули {sorted(unused)}'
+    )
+
+
+def test_query_skips_http_stack(tmp_path):
+    completed = subprocess.run(
+        [sys.executable, '-c', QUERY_CODE, str(tmp_path)],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    modules = set(completed.stdout.split())
+    assert 'main' in modules
+    loaded = {'requests', 'requests_cache', 'cache', 'scheduler'} & modules
+    assert not loaded, (
+        f'Режим query не должен загружать модули {sorted(loaded)} '
+        'и открывать кеш HTTP-запросов'
+    )
+    assert not (tmp_path / 'cache').exists(), (
+        'Режим query не должен создавать файлы кеша'
+    )
@@ -0,0 +1,89 @@
+import datetime as dt
+from contextlib import closing
+from pathlib import Path
+try:
+    from src import store
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `store.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `store.py`'
+
+
+def pep_record(number, status='Final', mismatch=False,
+               checked_at='2024-01-01T00:00:00'):
+    url = f'https://peps.python.org/pep-{number:04d}/'
+    return (url, number, f'PEP {number}', 'SF', status, 'Standards Track',
+            mismatch, checked_at)
+
+
+def test_open_store_uses_wal(tmp_path):
+    with closing(store.open_store(Path(tmp_path) / 'peps.sqlite3')) as db:
+        mode = db.execute('PRAGMA journal_mode').fetchone()[0]
+    assert mode == 'wal', 'База записей PEP должна работать в режиме WAL'
+
+
+def test_save_pep_records_in_batches(tmp_path):
+    with closing(store.open_store(Path(tmp_path) / 'peps.sqlite3')) as db:
+        saved = store.save_pep_records(
+            db, (pep_record(number) for number in range(1, 8)), batch_size=3)
+        store.save_pep_records(db, [pep_record(1, status='Superseded')])
+        count = db.execute('SELECT COUNT(*) FROM peps').fetchone()[0]
+        status = db.execute(
+            'SELECT status FROM peps WHERE number = 1').fetchone()[0]
+    assert saved == 7
+    assert count == 7, 'Повторная запись PEP должна заменять прежнюю'
+    assert status == 'Superseded'
+
+
+def test_query_peps_since(tmp_path):
+    with closing(store.open_store(Path(tmp_path) / 'peps.sqlite3')) as db:
+        store.save_pep_records(db, [
+            pep_record(1, mismatch=True, checked_at='2024-01-01T10:00:00'),
+            pep_record(2, mismatch=True, checked_at='2024-03-01T10:00:00'),
+            pep_record(3, checked_at='2024-03-01T10:00:00'),
+        ])
+        got = list(store.query_peps(
+            db, mismatches=True, since=dt.date(2024, 2, 1).isoformat()))
+    assert [row[0] for row in got] == [2], (
+        'Выборка должна учитывать время проверки записи'
+    )
+
+
+def test_query_peps_uses_index(tmp_path):
+    with closing(store.open_store(Path(tmp_path) / 'peps.sqlite3')) as db:
+        plan = db.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM peps '
+            'WHERE status = ? AND type = ?', ('Final', 'Standards Track')
+        ).fetchall()
+    assert any('peps_status_type' in row[-1] for row in plan), (
+        'Выборка по статусу и типу должна использовать индекс'
+    )
+
+
+def test_query_peps_since_first_mismatch(tmp_path):
+    with closing(store.open_store(Path(tmp_path) / 'peps.sqlite3')) as db:
+        store.save_pep_records(db, [
+            pep_record(1, mismatch=True, checked_at='2024-01-01T10:00:00'),
+            pep_record(2, checked_at='2024-01-01T10:00:00'),
+            pep_record(3, mismatch=True, checked_at='2024-01-01T10:00:00'),
+        ])
+        store.save_pep_records(db, [
+            pep_record(1, mismatch=True, checked_at='2024-03-01T10:00:00'),
+            pep_record(2, mismatch=True, checked_at='2024-03-01T10:00:00'),
+            pep_record(3, checked_at='2024-03-01T10:00:00'),
+        ])
+        since = dt.date(2024, 2, 1).isoformat()
+        got = list(store.query_peps(db, mismatches=True, since=since))
+        store.save_pep_records(db, [
+            pep_record(3, mismatch=True, checked_at='2024-04-01T10:00:00'),
+        ])
+        reappeared = list(store.query_peps(
+            db, since=dt.date(2024, 3, 15).isoformat()))
+    assert [row[0] for row in got] == [2], (
+        'Выборка `--since` должна учитывать время первого обнаружения '
+        'несовпадения, а не время последней проверки'
+    )
+    assert [row[0] for row in reappeared] == [3], (
+        'Исчезнувшее и снова появившееся несовпадение должно считаться новым'
+    )
+
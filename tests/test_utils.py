@@ -54,3 +54,21 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+def test_make_soup_parse_only():
+    html = (
+        '<html><body><div class="noise"><p>text</p></div>'
+        '<table class="docutils"><tr><td><a href="a.zip">a</a></td></tr>'
+        '</table></body></html>'
+    )
+    scope = bs4.SoupStrainer('table', {'class': 'docutils'})
+    got = utils.make_soup(html, parse_only=scope)
+    assert got.find('div') is None, (
+        'Функция `make_soup` должна строить дерево только '
+        'для заданной области страницы'
+    )
+    assert utils.find_tag(got, 'a')['href'] == 'a.zip'
+    with pytest.raises(BaseException) as excinfo:
+        utils.find_tag(got, 'p')
+    assert excinfo.typename == 'ParserFindTagException'